@@ -5,12 +5,100 @@ This module provides the Hydrophone class for reading hydrophone calibration
 files and performing frequency-dependent sensitivity corrections.
 """
 
+import io
+import re
+import warnings
+
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Union, Dict, Any, Tuple
-from scipy import signal
-from scipy.interpolate import interp1d
+from scipy import fft, signal
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the NumPy path below is used instead
+    njit = None
+
+try:
+    import pyfftw
+    from pyfftw.interfaces import scipy_fft as pyfftw_fft
+except ImportError:  # pyfftw is optional; scipy.fft (pocketfft) is used instead
+    pyfftw = None
+else:
+    # Keep planned FFTW objects alive between captures so each length is only planned once
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+
+
+# Bin count above which the inverse-filter kernel is worth spreading across threads
+_PARALLEL_MIN_BINS = 65536
+
+# Per-capture-geometry spectra kept by each Hydrophone
+_SPECTRUM_CACHE_SIZE = 32
+
+if njit is not None:
+    # No fastmath here: it would let the NaN check below be optimized away
+    @njit(cache=True)
+    def _interp_sens(f, freq_cal, pa_per_v, slope_left, slope_right):
+        """
+        Pa/V at a single frequency: linear interpolation of the calibration, with
+        end-slope extrapolation outside it. NaN gives NaN, as with np.interp.
+        """
+        if f != f:
+            return np.nan
+        n_cal = freq_cal.shape[0]
+        if f <= freq_cal[0]:
+            return pa_per_v[0] + (f - freq_cal[0]) * slope_left
+        if f >= freq_cal[n_cal - 1]:
+            return pa_per_v[n_cal - 1] + (f - freq_cal[n_cal - 1]) * slope_right
+        i = np.searchsorted(freq_cal, f)
+        w = (f - freq_cal[i - 1]) / (freq_cal[i] - freq_cal[i - 1])
+        return pa_per_v[i - 1] + w * (pa_per_v[i] - pa_per_v[i - 1])
+
+    def _build_inverse_filter_impl(frequencies, freq_cal, pa_per_v, slope_left, slope_right):
+        """
+        Per-bin Pa/V inverse filter. Bin 0 is treated as DC and uses the
+        sensitivity at the lowest calibrated frequency.
+        """
+        n_bins = frequencies.shape[0]
+        out = np.empty(n_bins)
+        for k in prange(n_bins):
+            if k == 0:
+                out[k] = pa_per_v[0]
+            else:
+                out[k] = _interp_sens(frequencies[k], freq_cal, pa_per_v, slope_left, slope_right)
+        return out
+
+    # prange runs serially in the non-parallel build, which avoids thread start-up on short captures
+    _build_inverse_filter_serial = njit(fastmath=True, cache=True)(_build_inverse_filter_impl)
+    _build_inverse_filter_parallel = njit(parallel=True, fastmath=True, cache=True)(_build_inverse_filter_impl)
+
+    def _build_inverse_filter(frequencies, freq_cal, pa_per_v, slope_left, slope_right):
+        """Compiled inverse filter, threaded only for long spectra."""
+        kernel = (_build_inverse_filter_parallel if frequencies.shape[0] > _PARALLEL_MIN_BINS
+                  else _build_inverse_filter_serial)
+        return kernel(frequencies, freq_cal, pa_per_v, slope_left, slope_right)
+
+
+def _rfft(x, n, workers):
+    """Real FFT along the last axis, using a cached FFTW plan when pyfftw is available."""
+    if pyfftw is not None:
+        return pyfftw_fft.rfft(x, n=n, axis=-1, workers=workers, planner_effort='FFTW_MEASURE')
+    return fft.rfft(x, n=n, axis=-1, workers=workers)
+
+
+def _irfft(x, n, workers):
+    """Inverse real FFT along the last axis, using a cached FFTW plan when pyfftw is available."""
+    if pyfftw is not None:
+        return pyfftw_fft.irfft(x, n=n, axis=-1, workers=workers, planner_effort='FFTW_MEASURE')
+    return fft.irfft(x, n=n, axis=-1, workers=workers)
+
+# Header end marker line (the data table starts on the following line)
+_HEADER_END_RE = re.compile(r'^[ \t]*HEADER_END[^\n]*(?:\n|$)', re.MULTILINE)
+
+# Tab-separated header entry: key (not a comment) and a non-empty value, surrounding whitespace stripped
+_HEADER_ENTRY_RE = re.compile(r'^[ \t]*([^#\s][^\t\n]*)\t([^\n]*?\S)[ \t\r]*$', re.MULTILINE)
 
 
 class Hydrophone:
@@ -24,68 +112,70 @@ class Hydrophone:
         sensitivity_interp (callable): Interpolation function for sensitivity vs frequency
     """
     
-    def __init__(self, calibration_file_path: Union[str, Path]):
+    def __init__(self, calibration_file_path: Union[str, Path], workers: int = -1):
         """
         Initialize the Hydrophone object by reading a calibration file.
         
         Parameters:
             calibration_file_path: Path to the calibration file
+            workers: Number of threads used by scipy.fft for batched deconvolution (-1 uses all cores)
         """
         self.calibration_file_path = Path(calibration_file_path)
+        self.workers = workers
         self.metadata = {}
         self.calibration_data = None
         self.sensitivity_interp = None
+        self._freq_hz = None
+        self._pa_per_v = None
+        self._freq_hz_min = None
+        self._freq_hz_max = None
+        # (kind, n_fft, sampling interval in fs, ...) -> read-only spectrum
+        self._spectrum_cache = {}
         
         self._parse_calibration_file()
         self._create_sensitivity_interpolator()
     
     def _parse_calibration_file(self):
         """Parse the calibration file to extract metadata and tabular data."""
-        with open(self.calibration_file_path, 'r') as f:
-            lines = f.readlines()
+        text = self.calibration_file_path.read_text()
         
-        # Parse metadata
-        data_fields = []
-        header_ended = False
-        data_lines = []
+        # Split the header from the tabular data at the header end marker
+        header_end = _HEADER_END_RE.search(text)
+        header = text if header_end is None else text[:header_end.start()]
         
-        for line in lines:
-            line = line.strip()
-            
-            # Skip comments and empty lines
-            if line.startswith('#') or not line:
-                continue
-            
-            # Check for header end
-            if line.startswith('HEADER_END'):
-                header_ended = True
-                continue
-            
-            if not header_ended:
-                # Handle DATA_FIELD entries specially (but not DATA_FIELDS)
-                if line.startswith('DATA_FIELD\t'):  # Exact match for DATA_FIELD followed by tab
-                    _, field_name = line.split('\t', 1)
-                    data_fields.append(field_name)
-                # Parse other metadata
-                elif '\t' in line and not line.startswith('DATA_FIELD'):
-                    key, value = line.split('\t', 1)
-                    self.metadata[key] = value
-            else:
-                # This is data
-                data_lines.append(line)
-        
-        # Parse tabular data
-        if data_lines and data_fields:
-            # Convert data lines to numeric arrays
-            data_rows = []
-            for line in data_lines:
-                values = line.split()
-                # Convert to float, handling scientific notation
-                numeric_values = [float(val) for val in values]
-                data_rows.append(numeric_values)
+        # Parse metadata from the tab-separated key/value header lines (comments never match)
+        data_fields = []
+        for key, value in _HEADER_ENTRY_RE.findall(header):
+            # Handle DATA_FIELD entries specially (but not DATA_FIELDS)
+            if key == 'DATA_FIELD':
+                data_fields.append(value)
+            elif not key.startswith('DATA_FIELD'):
+                self.metadata[key] = value
+        
+        # Parse tabular data with pandas' C parser
+        if header_end is not None and data_fields:
+            try:
+                # index_col=False stops pandas from turning surplus leading columns
+                # into the index; it warns instead, which is treated as an error
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error', pd.errors.ParserWarning)
+                    data = pd.read_csv(
+                        io.StringIO(text[header_end.end():]),
+                        sep=r'\s+',
+                        header=None,
+                        names=data_fields,
+                        index_col=False,
+                        comment='#',
+                        engine='c',
+                        dtype=np.float64
+                    )
+            except pd.errors.EmptyDataError:
+                return
+            except (pd.errors.ParserError, pd.errors.ParserWarning) as e:
+                raise ValueError(f"Calibration data rows do not match the {len(data_fields)} DATA_FIELD columns: {e}") from e
             
-            # Create DataFrame
-            self.calibration_data = pd.DataFrame(data_rows, columns=data_fields)
+            if not data.empty:
+                self.calibration_data = data
     
     def _create_sensitivity_interpolator(self):
         """Create interpolation function for sensitivity vs frequency."""
@@ -95,27 +185,62 @@ class Hydrophone:
             # Use V/Pa sensitivity for interpolation
             if 'SENS_VPERPA' in self.calibration_data.columns:
                 sens_vperpa = self.calibration_data['SENS_VPERPA'].values
-                self.sensitivity_interp = interp1d(
-                    freq_mhz * 1e6,  # Convert MHz to Hz
-                    1.0 / sens_vperpa,  # Convert V/Pa to Pa/V
-                    kind='linear',
-                    bounds_error=False,
-                    fill_value='extrapolate'
-                )
+                
+                # np.interp and the bisection kernel need strictly increasing sample points:
+                # sort, and keep the first row of any repeated calibration frequency
+                _, order = np.unique(freq_mhz, return_index=True)
+                self._freq_hz = np.ascontiguousarray(freq_mhz[order] * 1e6, dtype=np.float64)  # Convert MHz to Hz
+                self._pa_per_v = np.ascontiguousarray(1.0 / sens_vperpa[order], dtype=np.float64)  # Convert V/Pa to Pa/V
+                self._freq_hz_min = float(self._freq_hz[0])
+                self._freq_hz_max = float(self._freq_hz[-1])
+                
+                # End-segment slopes, used to extrapolate linearly outside the calibrated range
+                self._slope_left = (self._pa_per_v[1] - self._pa_per_v[0]) / (self._freq_hz[1] - self._freq_hz[0])
+                self._slope_right = (self._pa_per_v[-1] - self._pa_per_v[-2]) / (self._freq_hz[-1] - self._freq_hz[-2])
+                
+                self.sensitivity_interp = self._interpolate_pa_per_v
     
-    def get_sensitivity_pa_per_v(self, frequency_hz: float) -> float:
+    def _interpolate_pa_per_v(self, frequencies_hz, presorted: bool = False):
+        """
+        Linearly interpolate (and extrapolate) the Pa/V sensitivity at the given frequencies.
+        
+        When ``presorted`` is True (e.g. an rfft bin grid), the out-of-range bins are
+        contiguous at either end and are located by bisection instead of full-array masks.
+        """
+        freq = np.asarray(frequencies_hz, dtype=np.float64)
+        pa_per_v = np.interp(freq, self._freq_hz, self._pa_per_v)
+        if presorted and freq.ndim == 1:
+            lo = np.searchsorted(freq, self._freq_hz_min, side='left')
+            hi = np.searchsorted(freq, self._freq_hz_max, side='right')
+            pa_per_v[:lo] = self._pa_per_v[0] + (freq[:lo] - self._freq_hz_min) * self._slope_left
+            pa_per_v[hi:] = self._pa_per_v[-1] + (freq[hi:] - self._freq_hz_max) * self._slope_right
+            return pa_per_v
+        pa_per_v = np.where(freq < self._freq_hz_min,
+                            self._pa_per_v[0] + (freq - self._freq_hz_min) * self._slope_left,
+                            pa_per_v)
+        pa_per_v = np.where(freq > self._freq_hz_max,
+                            self._pa_per_v[-1] + (freq - self._freq_hz_max) * self._slope_right,
+                            pa_per_v)
+        return pa_per_v
+    
+    def get_sensitivity_pa_per_v(self, frequency_hz: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
         Get the sensitivity in Pa/V at a given frequency.
         
         Parameters:
-            frequency_hz: Frequency in Hz
+            frequency_hz: Frequency in Hz, or an array of frequencies
             
         Returns:
-            Sensitivity in Pa/V
+            Sensitivity in Pa/V: a float for a scalar frequency, otherwise an array of the same shape
         """
         if self.sensitivity_interp is None:
             raise ValueError("Sensitivity interpolator not available")
         
+        if np.ndim(frequency_hz) > 0:
+            return self.sensitivity_interp(frequency_hz)
+        if njit is not None:
+            return float(_interp_sens(float(frequency_hz), self._freq_hz, self._pa_per_v,
+                                      self._slope_left, self._slope_right))
         return float(self.sensitivity_interp(frequency_hz))
     
     def get_frequency_response(self, frequencies_hz: np.ndarray) -> np.ndarray:
@@ -145,68 +270,140 @@ class Hydrophone:
         a voltage vs time signal to pressure vs time, accounting for the frequency-
         dependent sensitivity.
         
+        The optional bandpass is the magnitude of a 4th-order Butterworth filter
+        (single pass, zero phase), applied to the whole spectrum. Earlier versions
+        zeroed the negative-frequency half when filtering, which halved the
+        amplitude of the bandpassed output, and evaluated the filter in transfer
+        function form, which loses accuracy for narrow low-frequency bands. The
+        bandpassed output is therefore about twice as large as before.
+        
         Parameters:
-            voltage_signal: Voltage signal array (V)
+            voltage_signal: Voltage signal array (V); multiple signals may be stacked along leading axes
             sampling_interval: Time between samples (seconds)
             center_frequency: Center frequency for optional bandpass filtering (Hz)
             bandwidth: Bandwidth for optional bandpass filtering (fraction of center frequency)
             
         Returns:
-            Pressure signal array (Pa)
+            Pressure signal array (Pa), float32 for integer or float32 input and float64 otherwise
         """
         if self.sensitivity_interp is None:
             raise ValueError("Sensitivity interpolator not available")
         
         # Calculate sampling frequency and frequency array
         fs = 1.0 / sampling_interval
-        n_samples = len(voltage_signal)
-        
-        # Create frequency array for FFT
-        frequencies = np.fft.fftfreq(n_samples, sampling_interval)
+        # Promote no further than float32: int16/float32 scope data stays single precision
+        # (complex64 spectra), while float64 input keeps full precision
+        voltage_signal = np.asarray(voltage_signal)
+        voltage_signal = voltage_signal.astype(np.result_type(voltage_signal.dtype, np.float32), copy=False)
+        # No zero padding: the deconvolution is circular over the capture itself, so
+        # the edge samples match the full complex FFT result for every length
+        n_fft = voltage_signal.shape[-1]
         
         # Take FFT of voltage signal
-        voltage_fft = np.fft.fft(voltage_signal)
-        
-        # Get frequency response (handle DC and negative frequencies)
-        freq_response = np.zeros_like(frequencies, dtype=complex)
-        
-        # For positive frequencies
-        pos_mask = frequencies > 0
-        if np.any(pos_mask):
-            freq_response[pos_mask] = self.get_frequency_response(frequencies[pos_mask])
-        
-        # For DC (f=0), use the sensitivity at the lowest calibrated frequency
-        if frequencies[0] == 0:
-            min_freq = self.calibration_data['FREQ_MHz'].min() * 1e6
-            freq_response[0] = self.get_sensitivity_pa_per_v(min_freq)
-        
-        # For negative frequencies, use conjugate symmetry
-        neg_mask = frequencies < 0
-        if np.any(neg_mask):
-            # Find corresponding positive frequencies
-            pos_frequencies = -frequencies[neg_mask]
-            freq_response[neg_mask] = self.get_frequency_response(pos_frequencies)
-
-        # Optional hamming-windowed bandpass filtering
+        voltage_fft = _rfft(voltage_signal, n_fft, self.workers)
+        
+        # Pa/V at each bin, times the optional Butterworth bandpass; real, and cached
+        # per capture geometry in the signal's dtype
         if center_frequency is not None:
-            # Create bandpass filter
-            nyquist = fs / 2.0
-            low_cut = max(center_frequency * (1 - bandwidth / 2), 0) / nyquist
-            high_cut = min(center_frequency * (1 + bandwidth / 2), nyquist) / nyquist
-            b, a = signal.butter(4, [low_cut, high_cut], btype='band')
-            w, h = signal.freqz(b, a, worN=frequencies.size, fs=fs)
-            # Interpolate filter response to match frequencies
-            filter_response = np.interp(frequencies, w, np.abs(h))
-            freq_response *= filter_response
+            center_frequency, bandwidth = float(center_frequency), float(bandwidth)
+        freq_response = self._deconvolution_response(n_fft, sampling_interval, center_frequency,
+                                                     bandwidth, voltage_signal.dtype)
         
         # Apply deconvolution (multiply by frequency response)
         pressure_fft = voltage_fft * freq_response
         
         # Take inverse FFT to get pressure signal
-        pressure_signal = np.fft.ifft(pressure_fft).real
+        pressure_signal = _irfft(pressure_fft, n_fft, self.workers)
         
         return pressure_signal
     
+    def _cached_spectrum(self, key, build):
+        """
+        Returns the read-only spectrum cached under key, calling build() on a miss.
+        
+        The cache belongs to this instance, so it is freed with the Hydrophone;
+        the oldest entry is dropped once it holds _SPECTRUM_CACHE_SIZE spectra.
+        """
+        spectrum = self._spectrum_cache.get(key)
+        if spectrum is None:
+            spectrum = build()
+            spectrum.flags.writeable = False
+            if len(self._spectrum_cache) >= _SPECTRUM_CACHE_SIZE:
+                del self._spectrum_cache[next(iter(self._spectrum_cache))]
+            self._spectrum_cache[key] = spectrum
+        return spectrum
+    
+    def _deconvolution_response(self, n_fft: int, sampling_interval: float,
+                                center_frequency: float|None, bandwidth: float,
+                                dtype: np.dtype) -> np.ndarray:
+        """
+        Per-bin response applied to the voltage spectrum, in the signal's dtype, read-only.
+        
+        The sensitivity spectrum and optional bandpass magnitude are combined and
+        cast once per dtype, so float32 captures do not copy a float64 spectrum
+        on every call.
+        """
+        if center_frequency is None:
+            bandwidth = None
+        key = ('response', n_fft, round(sampling_interval * 1e15), center_frequency, bandwidth, np.dtype(dtype).str)
+        
+        def build():
+            response = self._sensitivity_spectrum(n_fft, sampling_interval)
+            if center_frequency is not None:
+                response = response * self._bandpass_magnitude(n_fft, sampling_interval,
+                                                               center_frequency, bandwidth)
+            return response.astype(dtype)
+        
+        return self._cached_spectrum(key, build)
+    
+    def _sensitivity_spectrum(self, n_fft: int, sampling_interval: float) -> np.ndarray:
+        """
+        Pa/V sensitivity at the rfft bin frequencies, read-only.
+        
+        Cached per capture geometry, so a scan of same-length captures only
+        interpolates the calibration curve once. The sampling interval is keyed
+        to the femtosecond, so float noise in it still hits the cache. Bin 0 is
+        treated as DC and uses the sensitivity at the lowest calibrated frequency.
+        """
+        key = ('sensitivity', n_fft, round(sampling_interval * 1e15))
+        return self._cached_spectrum(key, lambda: self._build_sensitivity_spectrum(n_fft, sampling_interval))
+    
+    def _build_sensitivity_spectrum(self, n_fft: int, sampling_interval: float) -> np.ndarray:
+        """Interpolates the Pa/V sensitivity at the rfft bin frequencies."""
+        # The voltage signal is real, so only the non-negative half of the spectrum is needed
+        frequencies = fft.rfftfreq(n_fft, sampling_interval)
+        if njit is not None:
+            freq_response = _build_inverse_filter(frequencies, self._freq_hz, self._pa_per_v,
+                                                  self._slope_left, self._slope_right)
+        else:
+            freq_response = self._interpolate_pa_per_v(frequencies, presorted=True)
+            freq_response[0] = self._pa_per_v[0]
+        return freq_response
+    
+    def _bandpass_magnitude(self, n_fft: int, sampling_interval: float,
+                            center_frequency: float, bandwidth: float) -> np.ndarray:
+        """
+        Magnitude of the 4th-order Butterworth bandpass at the rfft bin frequencies, read-only.
+        
+        Cached per capture geometry, since repeated captures (e.g. during a peak
+        search) share the same length, sampling interval and filter settings.
+        """
+        key = ('bandpass', n_fft, round(sampling_interval * 1e15), center_frequency, bandwidth)
+        return self._cached_spectrum(key, lambda: self._build_bandpass_magnitude(
+            n_fft, sampling_interval, center_frequency, bandwidth))
+    
+    @staticmethod
+    def _build_bandpass_magnitude(n_fft: int, sampling_interval: float,
+                                  center_frequency: float, bandwidth: float) -> np.ndarray:
+        """Evaluates the Butterworth bandpass magnitude at the rfft bin frequencies."""
+        fs = 1.0 / sampling_interval
+        nyquist = fs / 2.0
+        low_cut = max(center_frequency * (1 - bandwidth / 2), 0) / nyquist
+        high_cut = min(center_frequency * (1 + bandwidth / 2), nyquist) / nyquist
+        sos = signal.butter(4, [low_cut, high_cut], btype='band', output='sos')
+        _, h = signal.sosfreqz(sos, worN=fft.rfftfreq(n_fft, sampling_interval), fs=fs)
+        return np.abs(h)
+    
     def get_metadata_summary(self) -> Dict[str, Any]:
         """
         Get a summary of the hydrophone metadata.
@@ -263,39 +460,26 @@ class Hydrophone:
         fig, axes = plt.subplots(2, 2, figsize=figsize)
         fig.suptitle(f'Hydrophone Calibration Data - SN: {self.metadata.get("HYD_SN", "Unknown")}')
         
-        freq_mhz = self.calibration_data['FREQ_MHz']
-        
-        # Sensitivity in dB
-        if 'SENS_DB' in self.calibration_data.columns:
-            axes[0, 0].plot(freq_mhz, self.calibration_data['SENS_DB'])
-            axes[0, 0].set_xlabel('Frequency (MHz)')
-            axes[0, 0].set_ylabel('Sensitivity (dB re 1V/µPa)')
-            axes[0, 0].set_title('Sensitivity (dB)')
-            axes[0, 0].grid(True)
-        
-        # Sensitivity in V/Pa
-        if 'SENS_VPERPA' in self.calibration_data.columns:
-            axes[0, 1].semilogy(freq_mhz, self.calibration_data['SENS_VPERPA'])
-            axes[0, 1].set_xlabel('Frequency (MHz)')
-            axes[0, 1].set_ylabel('Sensitivity (V/Pa)')
-            axes[0, 1].set_title('Sensitivity (Linear)')
-            axes[0, 1].grid(True)
-        
-        # Capacitance
-        if 'CAP_PF' in self.calibration_data.columns:
-            axes[1, 0].plot(freq_mhz, self.calibration_data['CAP_PF'])
-            axes[1, 0].set_xlabel('Frequency (MHz)')
-            axes[1, 0].set_ylabel('Capacitance (pF)')
-            axes[1, 0].set_title('Capacitance')
-            axes[1, 0].grid(True)
-        
-        # Power sensitivity
-        if 'SENS_V2CM2PERW' in self.calibration_data.columns:
-            axes[1, 1].semilogy(freq_mhz, self.calibration_data['SENS_V2CM2PERW'])
-            axes[1, 1].set_xlabel('Frequency (MHz)')
-            axes[1, 1].set_ylabel('Sensitivity (V²cm²/W)')
-            axes[1, 1].set_title('Power Sensitivity')
-            axes[1, 1].grid(True)
+        freq_mhz = self.calibration_data['FREQ_MHz'].to_numpy()
+        
+        # (column, axes position, log scale, y label, title)
+        panels = [
+            ('SENS_DB', (0, 0), False, 'Sensitivity (dB re 1V/µPa)', 'Sensitivity (dB)'),
+            ('SENS_VPERPA', (0, 1), True, 'Sensitivity (V/Pa)', 'Sensitivity (Linear)'),
+            ('CAP_PF', (1, 0), False, 'Capacitance (pF)', 'Capacitance'),
+            ('SENS_V2CM2PERW', (1, 1), True, 'Sensitivity (V²cm²/W)', 'Power Sensitivity'),
+        ]
+        
+        for column, position, log_scale, ylabel, title in panels:
+            if column not in self.calibration_data.columns:
+                continue
+            ax = axes[position]
+            plot = ax.semilogy if log_scale else ax.plot
+            plot(freq_mhz, self.calibration_data[column].to_numpy())
+            ax.set_xlabel('Frequency (MHz)')
+            ax.set_ylabel(ylabel)
+            ax.set_title(title)
+            ax.grid(True)
         
         plt.tight_layout()
         return fig
@@ -18,12 +18,19 @@ Example usage:
 
 import ctypes
 import logging
+import threading
+import time
 from typing import Dict, Optional, Tuple, Union, Literal
 import numpy as np
 
-from picosdk.functions import adc2mV, assert_pico_ok, mV2adc
+from picosdk.functions import assert_pico_ok, mV2adc
 from picosdk.ps5000a import ps5000a as ps
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy path below is used instead
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,6 +54,29 @@ RANGES_MV = {
     50000: ps.PS5000A_RANGE["PS5000A_50V"],
 }
 
+RATIO_MODE_AGGREGATE = ps.PS5000A_RATIO_MODE["PS5000A_RATIO_MODE_AGGREGATE"]
+
+# Full-scale range in mV for each range enum, for ADC count conversion
+RANGE_MV_BY_ENUM = {range_enum: range_mv for range_mv, range_enum in RANGES_MV.items()}
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _adc_ptp(adc_data, scale):
+        """Peak-to-peak of an int16 ADC buffer, scaled to mV, in a single pass."""
+        lo = 32767
+        hi = -32768
+        for v in adc_data:
+            if v < lo:
+                lo = v
+            if v > hi:
+                hi = v
+        return (hi - lo) * scale
+else:
+    def _adc_ptp(adc_data, scale):
+        """Peak-to-peak of an int16 ADC buffer, scaled to mV."""
+        return (int(adc_data.max()) - int(adc_data.min())) * scale
+
 CHANNELS = {
     'A': ps.PS5000A_CHANNEL["PS5000A_CHANNEL_A"],
     'B': ps.PS5000A_CHANNEL["PS5000A_CHANNEL_B"],
@@ -91,9 +121,25 @@ class Picoscope:
         self.chandle = ctypes.c_int16()
         self.status = {}
         self.max_adc = ctypes.c_int16()
+        # Driver out-parameters reused by every capture instead of being rebuilt per call
+        self._ready = ctypes.c_int16()
+        self._overflow = ctypes.c_int16()
+        self._n_samples = ctypes.c_int32()
         self.channel_ranges = {}  # Store configured channel ranges
         self.enabled_channels = set()
+        self._channel_order = ()  # enabled channels in a fixed A-D order, for the capture loops
         self._is_open = False
+        self._buffers = {}  # (channel, max_samples) -> (buffer_max, buffer_min)
+        self._registered_buffers = {}  # channel -> max_samples registered with the driver
+        self._time_arrays = {}  # (timebase, max_samples, n_samples) -> read-only time array
+        self._mv_scales = {}  # range enum -> mV per ADC count
+        # Block-ready notification from the driver; the ctypes callback must stay referenced
+        self._ready_event = threading.Event()
+        self._ready_status = None
+        self._block_pending = False
+        self._block_ready_callback = ps.BlockReadyType(self._on_block_ready)
+        # Serializes status/readback calls that may come from a capture worker thread
+        self._driver_lock = threading.Lock()
 
 
         if resolution not in RESOLUTION_MAP:
@@ -168,6 +214,8 @@ class Picoscope:
             assert_pico_ok(self.status["close"])
             
             self._is_open = False
+            self._block_pending = False
+            self._invalidate_buffers()
             logger.info("PicoScope closed successfully")
             
         except Exception as e:
@@ -218,6 +266,7 @@ class Picoscope:
                 offset_v
             )
             assert_pico_ok(self.status[f"setCh{channel}"])
+            self._invalidate_buffers()
             
             if enabled:
                 self.enabled_channels.add(channel)
@@ -225,6 +274,7 @@ class Picoscope:
             else:
                 self.enabled_channels.discard(channel)
                 self.channel_ranges.pop(channel, None)
+            self._channel_order = tuple(sorted(self.enabled_channels))
                 
             logger.info(f"Channel {channel} configured: {range_mv}mV, {coupling}, enabled={enabled}")
             
@@ -340,6 +390,12 @@ class Picoscope:
         if not self._is_open:
             raise PicoscopeError("Device not open. Use within a context manager or call open_unit() first.")
             
+        self._start_block(pre_trigger_samples, post_trigger_samples, timebase)
+        
+    def _start_block(self, pre_trigger_samples: int, post_trigger_samples: int, timebase: int):
+        """Issue ps5000aRunBlock with the block-ready callback armed."""
+        self._ready_event.clear()
+        self._ready_status = None
         try:
             self.status["runBlock"] = ps.ps5000aRunBlock(
                 self.chandle,
@@ -348,36 +404,70 @@ class Picoscope:
                 timebase,
                 None,  # time indisposed
                 0,     # segment index
-                None,  # lpReady callback
+                self._block_ready_callback,  # lpReady callback
                 None   # pParameter
             )
             assert_pico_ok(self.status["runBlock"])
+            self._block_pending = True
             
             logger.info(f"Block capture started: {pre_trigger_samples + post_trigger_samples} samples")
             
         except Exception as e:
             raise PicoscopeError(f"Failed to start block capture: {e}")
             
-    def wait_ready(self) -> bool:
+    def _on_block_ready(self, handle, status, p_parameter):
+        """Driver callback invoked from the driver's thread when a block capture finishes."""
+        self._ready_status = status
+        self._ready_event.set()
+        
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
         """
         Wait for data capture to complete.
         
+        After run_block() this blocks on the driver's block-ready callback
+        rather than polling. Otherwise ps5000aIsReady is polled with an
+        exponential backoff capped at 1 ms.
+        
+        Args:
+            timeout: Maximum time to wait in seconds (None waits indefinitely)
+            
         Returns:
             True when ready
             
         Raises:
-            PicoscopeError: If ready check fails
+            PicoscopeError: If ready check fails or the timeout expires
         """
         if not self._is_open:
             raise PicoscopeError("Device not open. Use within a context manager or call open_unit() first.")
+        
+        if self._block_pending:
+            if not self._ready_event.wait(timeout):
+                raise PicoscopeError(f"Timed out after {timeout} s waiting for ready")
+            self._block_pending = False
+            self.status["isReady"] = self._ready_status
+            try:
+                assert_pico_ok(self._ready_status)
+            except Exception as e:
+                raise PicoscopeError(f"Error waiting for ready: {e}")
+            logger.info("Data capture completed")
+            return True
             
-        ready = ctypes.c_int16(0)
-        check = ctypes.c_int16(0)
+        ready = self._ready
+        ready.value = 0
+        delay = 1e-5
+        t0 = time.monotonic()
         
         try:
-            while ready.value == check.value:
-                self.status["isReady"] = ps.ps5000aIsReady(self.chandle, ctypes.byref(ready))
+            while True:
+                with self._driver_lock:
+                    self.status["isReady"] = ps.ps5000aIsReady(self.chandle, ctypes.byref(ready))
                 assert_pico_ok(self.status["isReady"])
+                if ready.value:
+                    break
+                if timeout is not None and (time.monotonic() - t0) > timeout:
+                    raise TimeoutError(f"Timed out after {timeout} s")
+                time.sleep(delay)
+                delay = min(delay * 2, 1e-3)
                 
             logger.info("Data capture completed")
             return True
@@ -385,99 +475,300 @@ class Picoscope:
         except Exception as e:
             raise PicoscopeError(f"Error waiting for ready: {e}")
             
-    def get_data(self, max_samples: int, timebase: int) -> Dict[str, np.ndarray]:
+    def _read_values(self, max_samples: int, into: Optional[Dict[str, np.ndarray]] = None) -> Tuple[Dict[str, dict], int]:
         """
-        Retrieve captured data from all enabled channels.
+        Transfer the last block capture of all enabled channels into the cached buffers.
         
         Args:
             max_samples: Maximum number of samples to retrieve
-            timebase: Timebase used for capture (for time array generation)
-            
+            into: Optional int16 arrays, by channel, that the driver writes into
+                directly in place of the cached buffers
+        
         Returns:
-            Dictionary containing data arrays for each enabled channel plus time array
-            Keys: 'A', 'B', 'C', 'D' (for enabled channels), 'time'
-            
-        Raises:
-            PicoscopeError: If data retrieval fails
+            Tuple of (per-channel buffer dicts with 'max', 'min' and 'range', number of samples read)
         """
         if not self._is_open:
             raise PicoscopeError("Device not open. Use within a context manager or call open_unit() first.")
             
-        if not self.enabled_channels:
+        if not self._channel_order:
             raise PicoscopeError("No channels enabled for data capture")
             
-        # Create buffers and set data buffer locations
+        # Reuse buffers across captures; only (re)register them with the driver when needed
         buffers = {}
         
-        for channel in self.enabled_channels:
+        for channel in self._channel_order:
             channel_enum = CHANNELS[channel]
             
-            # Create max and min buffers (min not used in this example)
-            buffer_max = (ctypes.c_int16 * max_samples)()
-            buffer_min = (ctypes.c_int16 * max_samples)()
-            
-            # Set data buffer location
-            try:
-                self.status[f"setDataBuffers{channel}"] = ps.ps5000aSetDataBuffers(
-                    self.chandle,
-                    channel_enum,
-                    ctypes.byref(buffer_max),
-                    ctypes.byref(buffer_min),
-                    max_samples,
-                    0,  # segment index
-                    0   # ratio mode (no downsampling)
-                )
-                assert_pico_ok(self.status[f"setDataBuffers{channel}"])
-                
+            if into and channel in into:
+                out = into[channel]
+                registered = ('into', out.ctypes.data, max_samples)
+                if self._registered_buffers.get(channel) != registered:
+                    try:
+                        self.status[f"setDataBuffer{channel}"] = ps.ps5000aSetDataBuffer(
+                            self.chandle,
+                            channel_enum,
+                            out.ctypes.data,
+                            max_samples,
+                            0,  # segment index
+                            0   # ratio mode (no downsampling)
+                        )
+                        assert_pico_ok(self.status[f"setDataBuffer{channel}"])
+                    except Exception as e:
+                        raise PicoscopeError(f"Failed to set data buffer for channel {channel}: {e}")
+                    self._registered_buffers[channel] = registered
+                    # The driver keeps the pointer until the next registration; hold on to the array
+                    self._buffers[(channel, 'into')] = out
                 buffers[channel] = {
-                    'max': buffer_max,
-                    'min': buffer_min,
+                    'max': out,
+                    'min': None,
                     'range': self.channel_ranges[channel]
                 }
-                
-            except Exception as e:
-                raise PicoscopeError(f"Failed to set data buffer for channel {channel}: {e}")
+                continue
+            
+            key = (channel, max_samples)
+            
+            if key not in self._buffers:
+                # Create max and min buffers (min not used in this example)
+                self._buffers[key] = (
+                    (ctypes.c_int16 * max_samples)(),
+                    (ctypes.c_int16 * max_samples)(),
+                )
+            buffer_max, buffer_min = self._buffers[key]
+            
+            if self._registered_buffers.get(channel) != max_samples:
+                # Set data buffer location
+                try:
+                    self.status[f"setDataBuffers{channel}"] = ps.ps5000aSetDataBuffers(
+                        self.chandle,
+                        channel_enum,
+                        ctypes.byref(buffer_max),
+                        ctypes.byref(buffer_min),
+                        max_samples,
+                        0,  # segment index
+                        0   # ratio mode (no downsampling)
+                    )
+                    assert_pico_ok(self.status[f"setDataBuffers{channel}"])
+                    self._registered_buffers[channel] = max_samples
+                    
+                except Exception as e:
+                    raise PicoscopeError(f"Failed to set data buffer for channel {channel}: {e}")
+            
+            buffers[channel] = {
+                'max': buffer_max,
+                'min': buffer_min,
+                'range': self.channel_ranges[channel]
+            }
         
         # Retrieve data
-        overflow = ctypes.c_int16()
-        c_max_samples = ctypes.c_int32(max_samples)
+        overflow = self._overflow
+        c_max_samples = self._n_samples
+        c_max_samples.value = max_samples
         
         try:
-            self.status["getValues"] = ps.ps5000aGetValues(
-                self.chandle,
-                0,  # start index
-                ctypes.byref(c_max_samples),
-                0,  # downsample ratio
-                0,  # downsample ratio mode
-                0,  # segment index
-                ctypes.byref(overflow)
-            )
+            with self._driver_lock:
+                self.status["getValues"] = ps.ps5000aGetValues(
+                    self.chandle,
+                    0,  # start index
+                    ctypes.byref(c_max_samples),
+                    0,  # downsample ratio
+                    0,  # downsample ratio mode
+                    0,  # segment index
+                    ctypes.byref(overflow)
+                )
             assert_pico_ok(self.status["getValues"])
             
         except Exception as e:
             raise PicoscopeError(f"Failed to retrieve data: {e}")
         
+        return buffers, c_max_samples.value
+        
+    def get_data(self, max_samples: int, timebase: int, dtype=np.float64) -> Dict[str, np.ndarray]:
+        """
+        Retrieve captured data from all enabled channels.
+        
+        Args:
+            max_samples: Maximum number of samples to retrieve
+            timebase: Timebase used for capture (for time array generation)
+            dtype: Floating dtype of the mV arrays; np.float32 halves their size
+                and is exact to well below 1e-5 mV for 15-bit ADC counts
+            
+        Returns:
+            Dictionary containing data arrays for each enabled channel plus time array
+            Keys: 'A', 'B', 'C', 'D' (for enabled channels, mV in dtype), 'time'
+            
+        Raises:
+            PicoscopeError: If data retrieval fails
+        """
+        buffers, n_samples = self._read_values(max_samples)
+        
         # Convert ADC counts to mV and create result dictionary
         result = {}
         
-        for channel in self.enabled_channels:
+        for channel in self._channel_order:
             buffer_data = buffers[channel]
-            adc_data = buffer_data['max']
             channel_range = buffer_data['range']
             
-            # Convert to mV
-            mv_data = adc2mV(adc_data, channel_range, self.max_adc)
-            result[channel] = np.array(mv_data)
+            # Zero-copy view of the ctypes buffer, scaled to mV in one vectorized pass
+            adc_data = np.frombuffer(buffer_data['max'], dtype=np.int16, count=n_samples)
+            result[channel] = np.multiply(adc_data, self._mv_per_count(channel_range), dtype=dtype)
         
-        # Create time array
-        time_interval_ns, _ = self.get_timebase_info(timebase, max_samples)
-        time_array = np.linspace(0, (c_max_samples.value - 1) * time_interval_ns, c_max_samples.value)
-        result['time'] = time_array
+        result['time'] = self._time_array(timebase, max_samples, n_samples)
         
-        logger.info(f"Retrieved {c_max_samples.value} samples from {len(self.enabled_channels)} channels")
+        logger.info(f"Retrieved {n_samples} samples from {len(self._channel_order)} channels")
         
         return result
         
+    def get_data_into(self, out: np.ndarray, max_samples: int, channel: str = 'A') -> int:
+        """
+        Retrieve the last capture of one channel directly into a caller-provided array.
+        
+        The driver writes the raw int16 ADC counts straight into out, so a scan
+        can fill a preallocated result array in place with no intermediate
+        buffers or dictionaries. Multiply by mv_per_count(channel) for mV.
+        Other enabled channels are still transferred into the cached buffers.
+        
+        Args:
+            out: Writeable, C-contiguous int16 array with at least max_samples elements
+            max_samples: Maximum number of samples to retrieve
+            channel: Channel to retrieve
+            
+        Returns:
+            Number of samples written to out
+            
+        Raises:
+            PicoscopeError: If the channel is not enabled, out is unsuitable or data retrieval fails
+        """
+        if channel not in self.enabled_channels:
+            raise PicoscopeError(f"Channel {channel} is not enabled")
+        if (out.dtype != np.int16 or not out.flags.c_contiguous or not out.flags.writeable
+                or out.size < max_samples):
+            raise PicoscopeError(f"Output must be a writeable, C-contiguous int16 array of at least {max_samples} samples")
+            
+        _, n_samples = self._read_values(max_samples, into={channel: out})
+        return n_samples
+        
+    def mv_per_count(self, channel: str) -> float:
+        """
+        Scale factor from raw ADC counts to mV for a channel at its current range.
+        
+        Raises:
+            PicoscopeError: If the channel is not enabled
+        """
+        if channel not in self.enabled_channels:
+            raise PicoscopeError(f"Channel {channel} is not enabled")
+        return float(self._mv_per_count(self.channel_ranges[channel]))
+        
+    def get_peak_to_peak(self, max_samples: int, channel: str = 'A', downsample_ratio: int = 1) -> float:
+        """
+        Retrieve the last capture and return only the peak-to-peak voltage of one channel.
+        
+        The min/max scan runs directly on the int16 ADC buffer, so no mV or
+        time arrays are built. With downsample_ratio > 1 the device aggregates
+        each run of downsample_ratio samples into a min/max pair before the
+        transfer, which cuts the USB payload by that factor and gives the same
+        result, since the peaks of the aggregates are the peaks of the waveform.
+        
+        Args:
+            max_samples: Maximum number of samples to retrieve
+            channel: Channel to measure
+            downsample_ratio: On-device aggregation ratio (1 transfers every sample)
+            
+        Returns:
+            Peak-to-peak voltage in mV
+            
+        Raises:
+            PicoscopeError: If the channel is not enabled or data retrieval fails
+        """
+        if channel not in self.enabled_channels:
+            raise PicoscopeError(f"Channel {channel} is not enabled")
+            
+        if downsample_ratio > 1:
+            adc_max, adc_min = self._read_aggregate(channel, max_samples, downsample_ratio)
+            adc_range = int(adc_max.max()) - int(adc_min.min())
+            return float(adc_range * self._mv_per_count(self.channel_ranges[channel]))
+            
+        buffers, n_samples = self._read_values(max_samples)
+        adc_data = np.frombuffer(buffers[channel]['max'], dtype=np.int16, count=n_samples)
+        return float(_adc_ptp(adc_data, self._mv_per_count(buffers[channel]['range'])))
+        
+    def _read_aggregate(self, channel: str, max_samples: int, downsample_ratio: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Transfer the last block capture of one channel as on-device min/max aggregates.
+        
+        Returns:
+            Tuple of (per-segment maxima, per-segment minima) as int16 ADC counts
+        """
+        n_aggregates = -(-max_samples // downsample_ratio)
+        key = (channel, 'aggregate', n_aggregates)
+        
+        if key not in self._buffers:
+            self._buffers[key] = (
+                (ctypes.c_int16 * n_aggregates)(),
+                (ctypes.c_int16 * n_aggregates)(),
+            )
+        buffer_max, buffer_min = self._buffers[key]
+        
+        # Aggregate buffers are registered alongside (not instead of) the raw ones
+        registered_key = (channel, 'aggregate')
+        if self._registered_buffers.get(registered_key) != n_aggregates:
+            try:
+                self.status[f"setDataBuffers{channel}"] = ps.ps5000aSetDataBuffers(
+                    self.chandle,
+                    CHANNELS[channel],
+                    ctypes.byref(buffer_max),
+                    ctypes.byref(buffer_min),
+                    n_aggregates,
+                    0,  # segment index
+                    RATIO_MODE_AGGREGATE
+                )
+                assert_pico_ok(self.status[f"setDataBuffers{channel}"])
+                self._registered_buffers[registered_key] = n_aggregates
+                
+            except Exception as e:
+                raise PicoscopeError(f"Failed to set aggregate buffers for channel {channel}: {e}")
+        
+        overflow = self._overflow
+        c_n_aggregates = self._n_samples
+        c_n_aggregates.value = max_samples
+        
+        try:
+            with self._driver_lock:
+                self.status["getValues"] = ps.ps5000aGetValues(
+                    self.chandle,
+                    0,  # start index
+                    ctypes.byref(c_n_aggregates),
+                    downsample_ratio,
+                    RATIO_MODE_AGGREGATE,
+                    0,  # segment index
+                    ctypes.byref(overflow)
+                )
+            assert_pico_ok(self.status["getValues"])
+            
+        except Exception as e:
+            raise PicoscopeError(f"Failed to retrieve aggregated data: {e}")
+        
+        n = c_n_aggregates.value
+        return (np.frombuffer(buffer_max, dtype=np.int16, count=n),
+                np.frombuffer(buffer_min, dtype=np.int16, count=n))
+        
+    def _mv_per_count(self, channel_range) -> float:
+        """Scale factor from ADC counts to mV for a channel range enum, computed once per range."""
+        scale = self._mv_scales.get(channel_range)
+        if scale is None:
+            scale = self._mv_scales[channel_range] = RANGE_MV_BY_ENUM[channel_range] / self.max_adc.value
+        return scale
+        
+    def _time_array(self, timebase: int, max_samples: int, n_samples: int) -> np.ndarray:
+        """Return the cached, read-only time array (ns) for a capture of n_samples."""
+        time_key = (timebase, max_samples, n_samples)
+        time_array = self._time_arrays.get(time_key)
+        if time_array is None:
+            time_interval_ns, _ = self.get_timebase_info(timebase, max_samples)
+            time_array = np.arange(n_samples, dtype=np.float64) * time_interval_ns
+            time_array.flags.writeable = False
+            self._time_arrays[time_key] = time_array
+        return time_array
+        
     def capture_data(self, 
                     pre_trigger_samples: int = 2500,
                     post_trigger_samples: int = 10000,
@@ -507,6 +798,18 @@ class Picoscope:
         # Retrieve data
         return self.get_data(max_samples, timebase)
         
+    def _invalidate_buffers(self):
+        """
+        Forget cached buffers, driver buffer registrations, timebase lookups and scale factors.
+        
+        Called whenever the channel setup changes or the device is closed, so the
+        next get_data re-registers its buffers with the driver.
+        """
+        self._buffers.clear()
+        self._registered_buffers.clear()
+        self._time_arrays.clear()
+        self._mv_scales.clear()
+        
     def stop(self):
         """
         Stop any running data capture.
@@ -520,6 +823,7 @@ class Picoscope:
         try:
             self.status["stop"] = ps.ps5000aStop(self.chandle)
             assert_pico_ok(self.status["stop"])
+            self._block_pending = False
             logger.info("Data capture stopped")
             
         except Exception as e:
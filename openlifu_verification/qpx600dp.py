@@ -30,6 +30,7 @@ class QPX600DP:
             self.port = port
         
         self.ser = None
+        self._last_set_voltage = {1: None, 2: None}
 
     def __enter__(self):
         """
@@ -97,6 +98,38 @@ class QPX600DP:
         response = self.ser.readline().decode('ascii').strip()
         return response
 
+    def _query_raw(self, query):
+        """
+        Sends a query to the device and returns the undecoded response.
+
+        Used on the high-rate readback paths, where the bytes are parsed
+        directly by float() without an ASCII decode.
+
+        Args:
+            query (str): The query to send.
+
+        Returns:
+            bytes: The device's response, stripped of surrounding whitespace.
+        """
+        self._send_command(query)
+        return self.ser.readline().strip()
+
+    def _query_many(self, queries):
+        """
+        Sends several queries in a single write and reads back their responses.
+
+        The responses arrive in order, so one serial round-trip replaces
+        len(queries) sequential ones.
+
+        Args:
+            queries (list of str): The queries to send.
+
+        Returns:
+            list of bytes: The undecoded responses, stripped, in query order.
+        """
+        self._send_command("\n".join(queries))
+        return [self.ser.readline().strip() for _ in queries]
+
     # Instrument Specific Commands
     def set_voltage(self, voltage, *, output='both'):
         """
@@ -107,8 +140,10 @@ class QPX600DP:
             output (int or 'both'): The output channel (1, 2, or 'both').
         """
         outputs = [1, 2] if output == 'both' else [output]
+        # Send all channel settings in a single write
+        self._send_command("\n".join(f"V{out} {voltage}" for out in outputs))
         for out in outputs:
-            self._send_command(f"V{out} {voltage}")
+            self._last_set_voltage[out] = voltage
 
     def wait_ready(self, target=None, *, output='both', timeout=1.0, thresh=0.02, poll_interval=0.001) -> bool:
         """
@@ -125,20 +160,34 @@ class QPX600DP:
             bool: True if the voltage settled, False otherwise.
         """
         outputs = [1, 2] if output == 'both' else [output]
-        for out in outputs:
-            if not self.get_output_state(out):
+        states = self._query_many([f"OP{out}?" for out in outputs])
+        targets = {}
+        for out, state in zip(outputs, states):
+            if state != b'1':
                 continue  # No output to sync
-
-            _target = target if target is not None else self.get_set_voltage(out)
-
-            t0 = time.time()
-            while True:
-                actual_v = self.get_output_voltage(out)
-                if abs(actual_v - _target) / _target <= thresh:
-                    break
-                if (time.time() - t0) > timeout:
-                    return False
-                time.sleep(poll_interval)
+            if target is not None:
+                targets[out] = target
+            elif self._last_set_voltage[out] is not None:
+                targets[out] = self._last_set_voltage[out]
+            else:
+                targets[out] = self.get_set_voltage(out)
+
+        # Poll all unsettled channels in one round-trip so they settle within the same window
+        t0 = time.time()
+        while targets:
+            pending = list(targets)
+            responses = self._query_many([f"V{out}O?" for out in pending])
+            for out, response in zip(pending, responses):
+                actual_v = float(response.removesuffix(b'V'))
+                # Relative threshold, or an absolute one (in volts) when settling to 0V
+                tolerance = thresh * abs(targets[out]) if targets[out] else thresh
+                if abs(actual_v - targets[out]) <= tolerance:
+                    del targets[out]
+            if not targets:
+                break
+            if (time.time() - t0) > timeout:
+                return False
+            time.sleep(poll_interval)
         return True
 
     def get_set_voltage(self, output):
@@ -164,8 +213,8 @@ class QPX600DP:
         Returns:
             float: The output voltage.
         """
-        response = self._query(f"V{output}O?")
-        return float(response.removesuffix('V'))
+        response = self._query_raw(f"V{output}O?")
+        return float(response.removesuffix(b'V'))
 
     def set_current_limit(self, output, current):
         """
@@ -200,8 +249,8 @@ class QPX600DP:
         Returns:
             float: The output current.
         """
-        response = self._query(f"I{output}O?")
-        return float(response.removesuffix('A'))
+        response = self._query_raw(f"I{output}O?")
+        return float(response.removesuffix(b'A'))
 
     def set_output(self, output, state):
         """
@@ -323,6 +372,7 @@ class QPX600DP:
         Resets the instrument to factory defaults.
         """
         self._send_command("*RST")
+        self._last_set_voltage = {1: None, 2: None}
 
     def get_id(self):
         """
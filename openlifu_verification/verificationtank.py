@@ -1,8 +1,11 @@
 import logging
 import sys
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
+from scipy.spatial.distance import cdist
 
 from .picoscope import Picoscope
 from .qpx600dp import QPX600DP
@@ -17,6 +20,10 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 PICOSCOPE_RESOLUTION = "15BIT"
+SPEED_OF_SOUND = 1500  # m/s
+DELAY_CACHE_SIZE = 256
+DELAY_PROFILE = 1  # single delay-profile slot, overwritten in place for every focus
+PEAK_DOWNSAMPLE_RATIO = 100  # on-scope min/max aggregation used when only Vp-p is needed
 
 class VerificationTank:
     """
@@ -32,6 +39,10 @@ class VerificationTank:
         self.scope = None
         self.hv = None
         self.arr = None
+        self._positions_mm = None
+        self._delay_cache = OrderedDict()  # LRU: most recently used focus last
+        self._active_delay_key = None  # focus/apodization currently written to the TX chips
+        self._capture_pool = None  # encodes the next scan focus while a capture is read back
 
     def __enter__(self):
         """
@@ -71,6 +82,11 @@ class VerificationTank:
             transducers_path = Path(__file__).parent.parent.resolve()
             self.arr = Transducer.from_file(f"{transducers_path}/transducers/openlifu_{self.num_modules}x{self.frequency}_evt1.json")
             self.arr.sort_by_pin()
+            # Per-run element geometry, computed once and shared read-only by every focus
+            self._positions_mm = np.ascontiguousarray(self.arr.get_positions(units="mm"), dtype=np.float64)
+            self._positions_mm.flags.writeable = False
+            self._delay_cache.clear()
+            self._active_delay_key = None
 
 
         except Exception as e:
@@ -91,14 +107,11 @@ class VerificationTank:
             pulse_train_count=1
         )
 
-        #Dummy values for delays and apodizations
-        delays = np.zeros((1, self.arr.numelements()))
-        apodizations = np.ones((1, self.arr.numelements()))
-
-        pin_order = np.argsort([el.pin for el in self.arr.elements])
+        #Dummy values for delays and apodizations; uniform, so pin order does not apply.
+        #Fresh arrays, since Solution owns and may modify them
         solution = Solution(
-            delays = delays[:, pin_order],
-            apodizations = apodizations[:, pin_order],
+            delays = np.zeros((1, self.arr.numelements())),
+            apodizations = np.ones((1, self.arr.numelements())),
             pulse = pulse,
             voltage=voltage,
             sequence = sequence
@@ -108,6 +121,9 @@ class VerificationTank:
         
         self.hv.set_voltage(voltage)
 
+        # set_solution rewrites the register map, so previously encoded delays are stale
+        self._delay_cache.clear()
+        self._active_delay_key = None
         self.lifu.set_solution(
             solution=solution,
             profile_index=profile_index,
@@ -124,6 +140,9 @@ class VerificationTank:
             except Exception as e:
                 logger.error(f"Error turning off HV outputs: {e}")
             self.hv.__exit__(exc_type, exc_val, exc_tb)
+        if self._capture_pool:
+            self._capture_pool.shutdown()
+            self._capture_pool = None
         if self.scope:
             self.scope.__exit__(exc_type, exc_val, exc_tb)
         if self.lifu:
@@ -135,33 +154,110 @@ class VerificationTank:
         if self.arr is None:
             raise Exception("Transducer array not loaded. Please provide db_path during initialization.")
 
-        focus = np.array([x, y, z])
-        logger.info(f"calculating delays for {focus=}")
-        distances = np.sqrt(np.sum((focus - self.arr.get_positions(units="mm"))**2, 1)).reshape(-1)
-        tof = distances*1e-3 / 1500
-        delays = tof.max() - tof
-
-        if apodizations is None:
-            apodizations = np.ones_like(delays)
-
-        delay_profile = Tx7332DelayProfile(
-                    profile=1,
-                    delays=delays,
-                    apodizations=apodizations
-                )
-        self.lifu.txdevice.tx_registers.add_delay_profile(delay_profile)
+        key = self._delay_key(x, y, z, apodizations)
+        if key == self._active_delay_key:
+            logger.info("delays unchanged, skipping register write")
+            return
+        data_registers = self._encode_focus(key, x, y, z, apodizations)
         logger.info("writing registers...")
-        control_registers = self.lifu.txdevice.tx_registers.get_delay_control_registers()
-        data_registers = self.lifu.txdevice.tx_registers.get_delay_data_registers(pack=True, pack_single=True)
-
-        for txi, (ctrl_regs, data_regs) in enumerate(zip(control_registers, data_registers)):
-            #if not uniform_apodization: #TODO add this as a parameter
-            #    for addr, reg_values in ctrl_regs.items():
-            #        if not self.lifu.txdevice.write_register(identifier=txi, address=addr, value=reg_values):
-            #            logger.error(f"Error applying TX CHIP ID: {txi} registers")
-            for addr, reg_values in data_regs.items():
-                if not self.lifu.txdevice.write_block(identifier=txi, start_address=addr, reg_values=reg_values):
-                    logger.error(f"Error applying TX CHIP ID: {txi} registers")
+
+        #if not uniform_apodization: #TODO add this as a parameter
+        #    control_registers = self.lifu.txdevice.tx_registers.get_delay_control_registers()
+        #    for txi, ctrl_regs in enumerate(control_registers):
+        #        for addr, reg_values in ctrl_regs.items():
+        #            if not self.lifu.txdevice.write_register(identifier=txi, address=addr, value=reg_values):
+        #                logger.error(f"Error applying TX CHIP ID: {txi} registers")
+        # Only remember the focus as written if every block was accepted
+        self._active_delay_key = None
+        if self._write_data_registers(data_registers):
+            self._active_delay_key = key
+
+    @staticmethod
+    def _delay_key(x, y, z, apodizations=None):
+        """Returns the delay cache key for a focus and apodization."""
+        return (round(x, 4), round(y, 4), round(z, 4),
+                None if apodizations is None else np.asarray(apodizations, dtype=np.float64).tobytes())
+
+    def compute_delays(self, foci):
+        """
+        Computes element delays for one or more foci in a single broadcast.
+
+        Args:
+            foci: Focus coordinates in mm, shape (3,) or (..., 3)
+
+        Returns:
+            Delays in seconds, shape (n_elements,) or (..., n_elements)
+
+        Raises:
+            Exception: If no transducer array is loaded
+        """
+        if self.arr is None:
+            raise Exception("Transducer array not loaded. Please provide db_path during initialization.")
+        foci = np.asarray(foci, dtype=np.float64)
+        # cdist works on (n_foci, 3) rows; restore the grid shape afterwards
+        distances = cdist(foci.reshape(-1, 3), self._positions_mm).reshape(foci.shape[:-1] + (-1,))
+        tof = distances*1e-3 / SPEED_OF_SOUND
+        return tof.max(axis=-1, keepdims=True) - tof
+
+    def prepare_foci(self, foci, apodizations=None):
+        """
+        Encodes the delay registers for a whole grid of foci ahead of a scan.
+
+        Delays for every focus come from one vectorized compute_delays call and
+        are encoded into the set_focus cache, so the scan loop only performs the
+        register writes.
+
+        Args:
+            foci: Focus coordinates in mm, shape (..., 3)
+            apodizations: Optional element apodizations shared by all foci
+
+        Raises:
+            Exception: If no transducer array is loaded
+        """
+        if self.arr is None:
+            raise Exception("Transducer array not loaded. Please provide db_path during initialization.")
+        foci = np.asarray(foci, dtype=np.float64).reshape(-1, 3)
+        if len(foci) > DELAY_CACHE_SIZE:
+            # With LRU eviction the first foci in scan order are the ones worth keeping:
+            # each focus encoded during the scan then evicts one already visited
+            logger.warning(f"{len(foci)} foci exceed the delay cache ({DELAY_CACHE_SIZE}); "
+                           f"only the first {DELAY_CACHE_SIZE} are encoded ahead, the rest during the scan")
+            foci = foci[:DELAY_CACHE_SIZE]
+        for (x, y, z), delays in zip(foci, self.compute_delays(foci)):
+            self._encode_focus(self._delay_key(x, y, z, apodizations), x, y, z, apodizations, delays=delays)
+
+    def _encode_focus(self, key, x, y, z, apodizations=None, delays=None):
+        """
+        Returns the packed delay data registers for a focus, encoding them on a cache miss.
+
+        Revisited foci (e.g. during a peak search) reuse the encoded registers;
+        once the cache is full the least recently used focus is evicted.
+        """
+        data_registers = self._delay_cache.get(key)
+        if data_registers is not None:
+            self._delay_cache.move_to_end(key)
+        else:
+            if delays is None:
+                logger.info(f"calculating delays for focus=({x}, {y}, {z})")
+                delays = self.compute_delays((x, y, z))
+
+            if apodizations is None:
+                apodizations = np.ones_like(delays)
+
+            delay_profile = Tx7332DelayProfile(
+                        profile=DELAY_PROFILE,
+                        delays=delays,
+                        apodizations=apodizations
+                    )
+            # add_delay_profile replaces an existing profile with the same index,
+            # so the register model holds one slot however many foci are visited.
+            tx_registers = self.lifu.txdevice.tx_registers
+            tx_registers.add_delay_profile(delay_profile, activate=True)
+            data_registers = tx_registers.get_delay_data_registers(profile=DELAY_PROFILE, pack=True, pack_single=True)
+            if len(self._delay_cache) >= DELAY_CACHE_SIZE:
+                self._delay_cache.popitem(last=False)
+            self._delay_cache[key] = data_registers
+        return data_registers
 
     def set_pulse(self, frequency_kHz, duration_msec):
         pulse_profile = Tx7332PulseProfile(
@@ -174,21 +270,52 @@ class VerificationTank:
         control_registers = self.lifu.txdevice.tx_registers.get_pulse_control_registers()
         data_registers = self.lifu.txdevice.tx_registers.get_pulse_data_registers(pack=True, pack_single=True)
 
-        for txi, (ctrl_regs, data_regs) in enumerate(zip(control_registers, data_registers)):
-            # for addr, reg_value in ctrl_regs.items():
-            #     if not self.lifu.txdevice.write_register(identifier=txi, address=addr, value=reg_value):
-            #         logger.error(f"Error applying TX CHIP ID: {txi} registers")                    
-            #     logger.info(f"{addr:04x}:{reg_value}")
+        # for txi, ctrl_regs in enumerate(control_registers):
+        #     for addr, reg_value in ctrl_regs.items():
+        #         if not self.lifu.txdevice.write_register(identifier=txi, address=addr, value=reg_value):
+        #             logger.error(f"Error applying TX CHIP ID: {txi} registers")
+        #         logger.info(f"{addr:04x}:{reg_value}")
+        self._write_data_registers(data_registers)
+
+    def _write_data_registers(self, data_registers):
+        """
+        Writes packed data registers to every TX chip.
+
+        Blocks are written sequentially: every chip sits behind the same serial
+        link, so threads would only contend for it.
+
+        Returns:
+            True if every block was written successfully
+        """
+        ok = True
+        for txi, data_regs in enumerate(data_registers):
             for addr, reg_values in data_regs.items():
                 if not self.lifu.txdevice.write_block(identifier=txi, start_address=addr, reg_values=reg_values):
                     logger.error(f"Error applying TX CHIP ID: {txi} registers")
+                    ok = False
+        return ok
 
     def set_scope_trigger(self, channel="A", threshold_mV=100, direction="rising"):
         if not self.scope:
             raise ValueError("No Picoscope Connected")
         self.scope.set_trigger(channel=channel, threshold_mV=threshold_mV, direction=direction)
 
-    def run_capture(self, pre_trigger_samples=2500, post_trigger_samples=10000, timebase=8):
+    def run_capture(self, pre_trigger_samples=2500, post_trigger_samples=10000, timebase=8, out=None, channel='A'):
+        """
+        Fires a single trigger and reads back the capture.
+
+        With out given, only the raw int16 ADC counts of one channel are read,
+        straight into out (see Picoscope.get_data_into), and out is returned;
+        otherwise the full data dictionary from Picoscope.get_data is returned.
+        """
+        self._trigger_block(pre_trigger_samples, post_trigger_samples, timebase)
+        if out is not None:
+            self.scope.get_data_into(out, pre_trigger_samples+post_trigger_samples, channel)
+            return out
+        return self.scope.get_data(pre_trigger_samples+post_trigger_samples, timebase)
+
+    def _trigger_block(self, pre_trigger_samples, post_trigger_samples, timebase):
+        """Arms a block capture, fires a single trigger and waits for the capture to finish."""
         if not self.scope:
             raise ValueError("No Picoscope Connected")
         logger.info("Sending Single Trigger...")
@@ -196,7 +323,60 @@ class VerificationTank:
         time.sleep(0.01)
         self.lifu.txdevice.start_trigger()
         self.scope.wait_ready()
-        return self.scope.get_data(pre_trigger_samples+post_trigger_samples, timebase)
+
+    def scan(self, foci, pre_trigger_samples=2500, post_trigger_samples=10000, timebase=8, out=None, channel='A'):
+        """
+        Captures one trigger at each focus of a scan grid.
+
+        Once capture i is in scope memory, the registers for focus i+1 are
+        written on a worker thread while capture i is read back, so the TX and
+        scope USB transfers overlap instead of running back to back. Foci are
+        not reprogrammed while a capture is armed.
+
+        Args:
+            foci: Focus coordinates in mm, shape (..., 3), visited in C order
+            pre_trigger_samples: Number of samples to capture before each trigger
+            post_trigger_samples: Number of samples to capture after each trigger
+            timebase: Picoscope timebase index
+            out: Optional preallocated, C-contiguous int16 array of shape
+                foci.shape[:-1] + (n_samples,) that receives the raw ADC counts
+                of one channel in place
+            channel: Channel written to out
+
+        Returns:
+            out, if given; otherwise a list with one data dictionary per focus, as
+            returned by run_capture
+        """
+        if not self.scope:
+            raise ValueError("No Picoscope Connected")
+        foci = np.asarray(foci, dtype=np.float64)
+        points = foci.reshape(-1, 3)
+        max_samples = pre_trigger_samples + post_trigger_samples
+        if out is not None:
+            if out.shape != foci.shape[:-1] + (max_samples,):
+                raise ValueError(f"out must have shape {foci.shape[:-1] + (max_samples,)}, got {out.shape}")
+            # Each capture is written as one stride-1 row, so the time axis must be last and contiguous
+            if not out.flags.c_contiguous:
+                raise ValueError("out must be C-contiguous")
+            rows = out.reshape(len(points), max_samples)
+        if self._capture_pool is None:
+            self._capture_pool = ThreadPoolExecutor(max_workers=1)
+        outputs = []
+        if len(points):
+            self.set_focus(*points[0])
+        for i in range(len(points)):
+            logger.info(f"focus {i + 1}/{len(points)}: {tuple(points[i])}")
+            self._trigger_block(pre_trigger_samples, post_trigger_samples, timebase)
+            next_focus = None
+            if i + 1 < len(points):
+                next_focus = self._capture_pool.submit(self.set_focus, *points[i + 1])
+            if out is not None:
+                self.scope.get_data_into(rows[i], max_samples, channel)
+            else:
+                outputs.append(self.scope.get_data(max_samples, timebase))
+            if next_focus is not None:
+                next_focus.result()
+        return out if out is not None else outputs
 
     def run_capture_with_interval(self, pre_trigger_samples=2500, post_trigger_samples=10000, sampling_interval_ns=16):
         """
@@ -229,30 +409,81 @@ class VerificationTank:
         Sets the focus to the given coordinates and returns the peak-to-peak voltage.
         """
         self.set_focus(x, y, z)
-        data = self.run_capture()
-        peak_to_peak = np.max(data['A']) - np.min(data['A'])
-        return peak_to_peak
+        pre_trigger_samples, post_trigger_samples = 2500, 10000
+        self._trigger_block(pre_trigger_samples, post_trigger_samples, timebase=8)
+        # Only Vp-p is needed: transfer min/max aggregates and skip the mV and time arrays
+        return self.scope.get_peak_to_peak(pre_trigger_samples+post_trigger_samples, channel='A',
+                                           downsample_ratio=PEAK_DOWNSAMPLE_RATIO)
 
-    def find_peak_by_gradient_ascent(self, x_start, y_start, z, step_size=0.5, iterations=10, learning_rate=0.1):
+    def find_peak_by_gradient_ascent(self, x_start, y_start, z, step_size=0.5, iterations=10, learning_rate=0.1, seed=None):
         """
         Finds the x-y coordinates that produce the maximum peak voltage using gradient ascent.
+
+        The gradient is estimated by simultaneous perturbation (SPSA): both axes are
+        perturbed at once by a random +/-step_size, so each iteration needs two
+        captures instead of three. Points falling within step_size/10 of an
+        earlier measurement in the same search reuse that value.
         """
+        rng = np.random.default_rng(seed)
         x = x_start
         y = y_start
 
+        # Measurements are binned to step_size/10 so a revisited bin skips the capture
+        bin_size = step_size / 10
+        measured = {}
+
+        def measure(points):
+            values = []
+            for px, py in points:
+                key = (round(px / bin_size), round(py / bin_size))
+                if key not in measured:
+                    measured[key] = self.get_peak_voltage(px, py, z)
+                values.append(measured[key])
+            return values
+
         for i in range(iterations):
             # Calculate the gradient
-            v_current = self.get_peak_voltage(x, y, z)
-            v_x = self.get_peak_voltage(x + step_size, y, z)
-            v_y = self.get_peak_voltage(x, y + step_size, z)
+            delta = rng.choice([-1.0, 1.0], size=2) * step_size
+            v_plus, v_minus = measure([(x + delta[0], y + delta[1]), (x - delta[0], y - delta[1])])
 
-            grad_x = (v_x - v_current) / step_size
-            grad_y = (v_y - v_current) / step_size
+            grad_x, grad_y = (v_plus - v_minus) / (2 * delta)
 
             # Update the coordinates
             x += learning_rate * grad_x
             y += learning_rate * grad_y
 
-            logger.info(f"Iteration {i+1}/{iterations}: x={x:.2f}, y={y:.2f}, Vp-p={v_current:.2f}")
+            logger.info(f"Iteration {i+1}/{iterations}: x={x:.2f}, y={y:.2f}, "
+                        f"Vp-p at +/-delta={v_plus:.2f}/{v_minus:.2f}")
+
+        return x, y
+
+    def find_peak_by_bayesian_search(self, x_start, y_start, z, search_radius=2.0, n_calls=15, seed=None):
+        """
+        Finds the x-y coordinates that produce the maximum peak voltage using Bayesian optimization.
+
+        A Gaussian-process surrogate (scikit-optimize ask/tell) chooses each capture
+        location inside a square of +/-search_radius around the start point, which
+        usually needs fewer captures than gradient ascent on a noisy objective.
+        """
+        try:
+            from skopt import Optimizer
+            from skopt.space import Real
+        except ImportError:
+            raise ImportError("scikit-optimize is required for Bayesian peak search")
+
+        opt = Optimizer(
+            [Real(x_start - search_radius, x_start + search_radius),
+             Real(y_start - search_radius, y_start + search_radius)],
+            base_estimator="GP",
+            n_initial_points=min(5, n_calls),
+            random_state=seed,
+        )
+
+        for i in range(n_calls):
+            x, y = opt.ask()
+            v = self.get_peak_voltage(x, y, z)
+            opt.tell([x, y], -v)
+            logger.info(f"Call {i+1}/{n_calls}: x={x:.2f}, y={y:.2f}, Vp-p={v:.2f}")
 
+        x, y = opt.get_result().x
         return x, y
@@ -0,0 +1,117 @@
+"""
+Shared acquisition loop for the single-pulse and voltage-scan scripts.
+"""
+
+import argparse
+import os
+import numpy as np
+from openlifu_verification import VerificationTank
+
+
+def parse_args(description=None):
+    """
+    Parses the command line options shared by the acquisition scripts.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--unattended', action='store_true',
+                        help="Start without waiting for a key press (also set by OPENLIFU_UNATTENDED=1)")
+    return parser.parse_args()
+
+
+def wait_for_start(unattended=False):
+    """
+    Blocks on the start prompt unless running unattended.
+
+    Args:
+        unattended: Skip the prompt. The OPENLIFU_UNATTENDED environment variable has the same effect.
+    """
+    if unattended or os.environ.get("OPENLIFU_UNATTENDED"):
+        return
+    input("Press any key to start")
+
+
+def run(voltages,
+        *,
+        focus=(0, 0, 50),
+        frequency_kHz=400,
+        initial_voltage=None,
+        duration_msec=20 / 400,
+        interval_msec=20,
+        num_modules=1,
+        trigger_threshold_mv=-2,
+        pre_trigger_samples=100,
+        post_trigger_samples=1500,
+        unattended=False,
+        out=None):
+    """
+    Captures one pulse at each HV supply voltage.
+
+    The LIFU is configured and focused, the first voltage is settled before the
+    start prompt, and each voltage is then settled and captured with its own
+    block capture.
+
+    Args:
+        voltages: HV supply voltages to capture at, in order
+        focus: (x, y, z) focus in mm
+        frequency_kHz: Pulse frequency
+        initial_voltage: Voltage passed to configure_lifu (defaults to the first voltage)
+        duration_msec: Pulse duration
+        interval_msec: Pulse interval
+        num_modules: Number of transducer modules
+        trigger_threshold_mv: Falling-edge trigger threshold on channel A
+        pre_trigger_samples: Samples captured before each trigger
+        post_trigger_samples: Samples captured after each trigger
+        unattended: Start without waiting for a key press
+        out: Optional (len(voltages), pre + post) array to write the captures into,
+            e.g. a memory-mapped .npy file
+
+    Returns:
+        Tuple of (time array in ns, channel A captures in mV with one row per voltage).
+        The captures are `out` if given, otherwise a new float32 array.
+    """
+    voltages = np.atleast_1d(np.asarray(voltages, dtype=np.float64))
+    if initial_voltage is None:
+        initial_voltage = voltages[0]
+    shape = (len(voltages), pre_trigger_samples + post_trigger_samples)
+    if out is None:
+        out = np.empty(shape, dtype=np.float32)
+    elif out.shape != shape:
+        raise ValueError(f"out must have shape {shape}, got {out.shape}")
+
+    with VerificationTank(frequency=frequency_kHz, num_modules=num_modules) as ver:
+        # Configure LIFU and HVPS
+        ver.configure_lifu(
+            frequency_kHz=frequency_kHz,
+            voltage=initial_voltage,
+            duration_msec=duration_msec,
+            interval_msec=interval_msec
+        )
+        ver.set_focus(*focus)
+
+        # Configure Picoscope
+        ver.scope.set_channel('A', range_mv=100, coupling='DC')
+        ver.scope.set_channel('B', range_mv=5000, coupling='DC')
+        ver.scope.set_trigger(channel='A', threshold_mv=trigger_threshold_mv, direction='falling')
+
+        # Enable power supply
+        ver.set_voltage(voltages[0])
+        ver.hv.set_all_outputs(True)
+        ver.hv.wait_ready(target=voltages[0])
+
+        wait_for_start(unattended)
+
+        t = None
+        for i, voltage in enumerate(voltages):
+            # The first voltage was already settled before the start prompt
+            if i > 0:
+                ver.set_voltage(voltage, wait=True)
+            if len(voltages) > 1:
+                print(f"voltage={voltage}, actual={ver.hv.get_output_voltage(1)},{ver.hv.get_output_voltage(2)}")
+            data = ver.run_capture(pre_trigger_samples=pre_trigger_samples, post_trigger_samples=post_trigger_samples)
+            out[i] = data["A"]
+            t = data["time"]
+
+        # Stop the trigger manually after the captures are complete
+        ver.lifu.txdevice.stop_trigger()
+
+    return t, out
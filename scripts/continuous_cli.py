@@ -1,6 +1,5 @@
 import logging
-from pathlib import Path
-import numpy as np
+import re
 from openlifu_verification import VerificationTank
 
 # Configure logging
@@ -14,6 +13,36 @@ if not logger.hasHandlers():
     logger.addHandler(handler)
     logger.propagate = False
 
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+# "v=<volts>"
+_VOLTAGE_RE = re.compile(rf"^v=\s*({_NUMBER})\s*$")
+# "x, y, z" focus in mm
+_FOCUS_RE = re.compile(rf"^\s*({_NUMBER})\s*,\s*({_NUMBER})\s*,\s*({_NUMBER})\s*$")
+# Any other comma-separated list of numbers (wrong number of coordinates)
+_NUMBER_LIST_RE = re.compile(rf"^\s*{_NUMBER}(?:\s*,\s*{_NUMBER})*\s*$")
+
+
+def _start(ver):
+    logger.info("Starting Trigger...")
+    ver.hv.set_all_outputs(True)
+    ver.lifu.txdevice.start_trigger()
+
+
+def _stop(ver):
+    logger.info("Stopping Trigger...")
+    ver.lifu.txdevice.stop_trigger()
+    ver.hv.set_all_outputs(False)
+
+
+# Literal commands; "exit" and the parametric commands are handled in the loop
+COMMANDS = {
+    "start": _start,
+    "stop": _stop,
+    "von": lambda ver: ver.hv.set_all_outputs(True),
+    "voff": lambda ver: ver.hv.set_all_outputs(False),
+}
+
+
 def main():
     # Parameters
     xInput = 0
@@ -44,33 +73,27 @@ def main():
                 command = input(":")
                 if command == "exit":
                     break
-                elif command == "start":
-                    logger.info("Starting Trigger...")
-                    ver.hv.set_all_outputs(True)
-                    ver.lifu.txdevice.start_trigger()
-                elif command == "stop":
-                    logger.info("Stopping Trigger...")
-                    ver.lifu.txdevice.stop_trigger()
-                    ver.hv.set_all_outputs(False)
-                elif command == 'von':
-                    ver.hv.set_all_outputs(True)
-                elif command == 'voff':
-                    ver.hv.set_all_outputs(False)
-                elif len(command) > 3 and command[:2] == "v=":
+                action = COMMANDS.get(command)
+                if action is not None:
+                    action(ver)
+                    continue
+                match = _VOLTAGE_RE.match(command)
+                if match:
                     try:
-                        new_v = float(command.split('=')[-1].strip())
-                        ver.set_voltage(new_v)
+                        ver.set_voltage(float(match.group(1)))
                     except ValueError:
                         print('Invalid command')
-                else:
+                    continue
+                match = _FOCUS_RE.match(command)
+                if match:
                     try:
-                        focus = [float(x) for x in command.split(",")]
-                        if len(focus) == 3:
-                            ver.set_focus(*focus)
-                        else:
-                            print("Invalid coordinates. Please provide x, y, and z.")
+                        ver.set_focus(*map(float, match.groups()))
                     except ValueError:
                         print('Invalid command')
+                elif _NUMBER_LIST_RE.match(command):
+                    print("Invalid coordinates. Please provide x, y, and z.")
+                else:
+                    print('Invalid command')
 
             # Ensure trigger is stopped and HV is off before exiting
             ver.lifu.txdevice.stop_trigger()
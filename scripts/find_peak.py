@@ -1,9 +1,6 @@
 import logging
-import sys
-from pathlib import Path
 
 from openlifu_verification.verificationtank import VerificationTank
-import openlifu
 
 # Configure logging
 logger = logging.getLogger(__name__)
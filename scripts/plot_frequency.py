@@ -25,14 +25,21 @@ data = np.load(datapath / "scan_freq_data.npz")
 
 
 # %%
-plt.plot(data['freq'], np.max(data['outputs'], axis=1),'.-')
+# Peaks are found on the raw int16 counts and only the per-frequency maxima are scaled to mV
+# (older files hold float mV and have no 'scale')
+outputs = data['outputs']
+scale = float(data['scale']) if 'scale' in data else 1.0
+peaks = outputs.max(axis=1).astype(np.float32) * scale
+
+# %%
+plt.plot(data['freq'], peaks,'.-')
 plt.xlabel('Frequency (kHz)')
 plt.ylabel('Peak (mV)')
 
 # %%
-plt.imshow(data['outputs'], aspect='auto', interpolation="None")
+plt.imshow(outputs, aspect='auto', interpolation="None")
 
 # %%
-plt.plot(data['voltages'][1:], np.diff(np.max(data['outputs'], axis=1))/np.diff(data['voltages']),'.-')
+plt.plot(data['voltages'][1:], np.diff(peaks)/np.diff(data['voltages']),'.-')
 plt.xlabel('Voltage (V)')
 plt.ylabel('Peak (mV/V)')
@@ -21,7 +21,8 @@ datapath = Path(openlifu_verification.__file__).parent.parent.resolve() / "scrip
 
 
 # %%
-data = np.load(datapath / "scan_voltage_data.npz")
+data = dict(np.load(datapath / "scan_voltage_data.npz"))
+data['outputs'] = np.load(datapath / "scan_voltage_data.npy", mmap_mode='r')
 
 
 # %%
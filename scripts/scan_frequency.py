@@ -2,6 +2,7 @@ import logging
 from pathlib import Path
 import numpy as np
 from openlifu_verification import VerificationTank
+from _runner import parse_args, wait_for_start
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -14,7 +15,7 @@ if not logger.hasHandlers():
     logger.addHandler(handler)
     logger.propagate = False
 
-def main():
+def main(unattended=False):
     # Parameters
     xInput = 0
     yInput = 0
@@ -49,16 +50,19 @@ def main():
             ver.hv.set_all_outputs(True)
             ver.hv.wait_ready()
 
-            s = input("Press any key to start")
+            wait_for_start(unattended)
 
-            outputs = []
-            for frequency in frequencies:
+            pre_trigger_samples, post_trigger_samples, timebase = 100, 1500, 8
+            n_samples = pre_trigger_samples + post_trigger_samples
+            outputs = np.empty((len(frequencies), n_samples), dtype=np.int16, order='C')
+            for i, frequency in enumerate(frequencies):
                 print(f"{frequency=}")
                 ver.set_pulse(frequency_kHz=frequency, duration_msec=duration_msec)                
                 print("Capturing...")
-                data = ver.run_capture(pre_trigger_samples=100, post_trigger_samples=1500)
+                ver.run_capture(pre_trigger_samples, post_trigger_samples, timebase, out=outputs[i])
                 print("Complete")
-                outputs.append(data)
+            t = np.arange(n_samples) * ver.scope.get_timebase_info(timebase, n_samples)[0]
+            mv_per_count = ver.scope.mv_per_count('A')
 
             # Stop the trigger manually after the scan is complete
             ver.lifu.txdevice.stop_trigger()
@@ -68,16 +72,14 @@ def main():
         return # Exit gracefully
 
     logger.info("Finished Frequency Scan.")
-    if outputs:
-        # Process and save data
-        t = outputs[0]["time"]
-        a_channel_outputs = np.array([output["A"] for output in outputs]).reshape([len(frequencies), -1])
+    if outputs.size:
+        # Save the raw int16 ADC counts; multiply by 'scale' for mV
         out_path = Path(__file__).parent.resolve() / 'data'
-        savedata = {'t': t, "outputs": a_channel_outputs, "freq": frequencies}
+        savedata = {'t': t, "outputs": outputs, "scale": mv_per_count, "freq": frequencies}
         np.savez(out_path / "scan_freq_data.npz", **savedata)
         logger.info("Data saved to scan_freq_data.npz")
     else:
         logger.warning("No data was collected.")
 
 if __name__ == "__main__":
-    main()
+    main(unattended=parse_args().unattended)
@@ -2,6 +2,7 @@ import logging
 from pathlib import Path
 import numpy as np
 from openlifu_verification import VerificationTank
+from _runner import parse_args, wait_for_start
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -14,7 +15,7 @@ if not logger.hasHandlers():
     logger.addHandler(handler)
     logger.propagate = False
 
-def main():
+def main(unattended=False):
     # Parameters
     zInput = 50
     xfoci = np.linspace(-10, 10, 41)
@@ -45,15 +46,21 @@ def main():
             # Enable power supply
             ver.hv.set_all_outputs(True)
 
-            s = input("Press any key to start")
+            # Encode the delays for the whole grid up front
+            xgrid, ygrid = np.meshgrid(xfoci, yfoci)
+            foci = np.stack([xgrid, ygrid, np.full_like(xgrid, zInput)], axis=-1)
+            ver.prepare_foci(foci)
 
-            outputs = []
-            for yfocus in yfoci:
-                for xfocus in xfoci:
-                    logger.info(f"{xfocus=}")
-                    ver.set_focus(xfocus, yfocus, zInput)
-                    data = ver.run_capture()
-                    outputs.append(data)
+            wait_for_start(unattended)
+
+            # Captures land directly in the preallocated result array; the next
+            # focus is written while the previous capture is read back
+            pre_trigger_samples, post_trigger_samples, timebase = 2500, 10000, 8
+            n_samples = pre_trigger_samples + post_trigger_samples
+            outputs = np.empty((len(yfoci), len(xfoci), n_samples), dtype=np.int16, order='C')
+            ver.scan(foci, pre_trigger_samples, post_trigger_samples, timebase, out=outputs)
+            t = np.arange(n_samples) * ver.scope.get_timebase_info(timebase, n_samples)[0]
+            mv_per_count = ver.scope.mv_per_count('A')
 
             # Stop the trigger manually after the scan is complete
             ver.lifu.txdevice.stop_trigger()
@@ -63,11 +70,9 @@ def main():
         return # Exit gracefully
 
     logger.info("Finished Lateral Scan.")
-    if outputs:
-        # Process and save data
-        t = outputs[0]["time"]
-        a_channel_outputs = np.array([output["A"] for output in outputs]).reshape([len(yfoci), len(xfoci), -1])
-        savedata = {'t': t, "outputs": a_channel_outputs, "xfoci": xfoci, "yfoci": yfoci}
+    if outputs.size:
+        # Save the raw int16 ADC counts; multiply by 'scale' for mV
+        savedata = {'t': t, "outputs": outputs, "scale": mv_per_count, "xfoci": xfoci, "yfoci": yfoci}
         out_path = Path(__file__).parent.resolve() / 'data'
         np.savez(out_path / "scan_lat_data.npz", **savedata)
         logger.info("Data saved to scan_lat_data.npz")
@@ -76,4 +81,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(unattended=parse_args().unattended)
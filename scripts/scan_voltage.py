@@ -1,7 +1,7 @@
 import logging
 from pathlib import Path
 import numpy as np
-from openlifu_verification import VerificationTank
+from _runner import parse_args, run
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -14,66 +14,50 @@ if not logger.hasHandlers():
     logger.addHandler(handler)
     logger.propagate = False
 
-def main():
+def main(unattended=False):
     # Parameters
-    xInput = 0
-    yInput = 0
-    zInput = 50
     voltages = np.arange(5, 20, 0.5)
-
-    frequency_kHz = 400
-    initial_voltage = 10.0
-    duration_msec = 20 / 400
-    interval_msec = 20
-    num_modules = 1
+    pre_trigger_samples, post_trigger_samples = 100, 1500
+
+    # Captures are written straight to a memory-mapped .npy file, with the time
+    # axis and voltages saved alongside in a small .npz. The scan goes to a
+    # temporary file that only replaces the previous dataset once it completes.
+    out_path = Path(__file__).parent.resolve() / 'data'
+    out_path.mkdir(exist_ok=True)
+    partial_path = out_path / "scan_voltage_data.partial.npy"
+    a_channel_outputs = np.lib.format.open_memmap(
+        partial_path, mode="w+", dtype=np.float32,
+        shape=(len(voltages), pre_trigger_samples + post_trigger_samples))
 
     logger.info("Starting Voltage Scan Script...")
     try:
-        with VerificationTank(frequency=frequency_kHz, num_modules=num_modules) as ver:
-            # Configure LIFU and HVPS
-            ver.configure_lifu(
-                frequency_kHz=frequency_kHz,
-                voltage=initial_voltage,
-                duration_msec=duration_msec,
-                interval_msec=interval_msec
-            )
-            ver.set_focus(xInput, yInput, zInput)
-
-            # Configure Picoscope
-            ver.scope.set_channel('A', range_mv=100, coupling='DC')
-            ver.scope.set_channel('B', range_mv=5000, coupling='DC')
-            ver.scope.set_trigger(channel='A', threshold_mv=-2, direction='falling')
-
-            # Enable power supply
-            ver.hv.set_all_outputs(True)
-
-            s = input("Press any key to start")
-
-            outputs = []
-            for voltage in voltages:
-                ver.set_voltage(voltage, wait=True)
-                print(f"{voltage=}, actual={ver.hv.get_output_voltage(1)},{ver.hv.get_output_voltage(2)}")
-                data = ver.run_capture(pre_trigger_samples=100, post_trigger_samples=1500)
-                outputs.append(data)
-
-            # Stop the trigger manually after the scan is complete
-            ver.lifu.txdevice.stop_trigger()
+        t, _ = run(
+            voltages,
+            focus=(0, 0, 50),
+            frequency_kHz=400,
+            initial_voltage=10.0,
+            duration_msec=20 / 400,
+            interval_msec=20,
+            num_modules=1,
+            unattended=unattended,
+            trigger_threshold_mv=-2,
+            pre_trigger_samples=pre_trigger_samples,
+            post_trigger_samples=post_trigger_samples,
+            out=a_channel_outputs,
+        )
 
     except (ConnectionError, ValueError, Exception) as e:
         logger.error(f"An error occurred: {e}")
+        del a_channel_outputs
+        partial_path.unlink(missing_ok=True)
         return # Exit gracefully
 
     logger.info("Finished Voltage Scan.")
-    if outputs:
-        # Process and save data
-        t = outputs[0]["time"]
-        a_channel_outputs = np.array([output["A"] for output in outputs]).reshape([len(voltages), -1])
-        savedata = {'t': t, "outputs": a_channel_outputs, "voltages": voltages}
-        out_path = Path(__file__).parent.resolve() / 'data'
-        np.savez(out_path / "scan_voltage_data.npz", **savedata)
-        logger.info("Data saved to scan_voltage_data.npz")
-    else:
-        logger.warning("No data was collected.")
+    a_channel_outputs.flush()
+    del a_channel_outputs  # close the mapping before the file is moved
+    np.savez(out_path / "scan_voltage_data.npz", t=t, voltages=voltages)
+    partial_path.replace(out_path / "scan_voltage_data.npy")
+    logger.info("Data saved to scan_voltage_data.npy / scan_voltage_data.npz")
 
 if __name__ == "__main__":
-    main()
+    main(unattended=parse_args().unattended)
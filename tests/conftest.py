@@ -0,0 +1,18 @@
+"""
+Shared pytest fixtures.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from openlifu_verification import Hydrophone
+
+# Path to the calibration file
+CAL_FILE = Path(__file__).parent.parent / "hydrophone_calibrations" / "HNR0500-2246_xxxxxx-xxxx-xx_xx_20221219 (1).txt"
+
+
+@pytest.fixture(scope="session")
+def hydrophone():
+    """Hydrophone parsed once per test session, so calibration parsing stays out of timings."""
+    return Hydrophone(CAL_FILE)
@@ -7,72 +7,184 @@ This script demonstrates how to use the Hydrophone class to:
 3. Deconvolve voltage signals to get pressure
 """
 
+import argparse
+import functools
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
+import pytest
+import matplotlib
 from pathlib import Path
-import sys
+from scipy import signal
 
-# Add the parent directory to the path so we can import openlifu_verification
-sys.path.append(str(Path(__file__).parent.parent))
+# Plots are only ever saved to files, so never open a window
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
 
 from openlifu_verification import Hydrophone
 
+# Sampling rate of the deconvolution test signal
+DECONV_FS = 100e6  # 100 MHz
 
-def test_hydrophone_basic_functionality():
-    """Test basic functionality of the Hydrophone class."""
-    print("Testing Hydrophone class...")
+
+@functools.lru_cache(maxsize=4)
+def _make_test_signal(fs, duration, freq_test):
+    """
+    Noisy test pressure signal (Pa), built once per parameter set.
+    
+    The noise is seeded, so a cached signal is identical to a fresh one. The
+    returned arrays are read-only because they are shared between calls.
+    """
+    # Single precision throughout, like the float32 mV data the Picoscope returns
+    t = np.linspace(0, duration, int(fs * duration), endpoint=False, dtype=np.float32)
     
-    # Path to the calibration file
-    cal_file = Path(__file__).parent.parent / "hydrophone_calibrations" / "HNR0500-2246_xxxxxx-xxxx-xx_xx_20221219 (1).txt"
+    # Create test pressure signal (Pa)
+    pressure_true = 1000 * np.sin(2 * np.pi * freq_test * t)  # 1000 Pa amplitude
     
-    # Create hydrophone object
-    hydrophone = Hydrophone(cal_file)
+    # Add some noise, seeded so every run sees the same signal
+    rng = np.random.default_rng(0)
+    noise = np.empty_like(pressure_true)
+    rng.standard_normal(dtype=np.float32, out=noise)
+    noise *= 10  # 10 Pa RMS noise
+    pressure_true += noise
+    
+    t.flags.writeable = False
+    pressure_true.flags.writeable = False
+    return t, pressure_true
+
+
+def test_hydrophone_basic_functionality(hydrophone):
+    """Test basic functionality of the Hydrophone class."""
+    # Report lines are collected and written once at the end
+    lines = ["Testing Hydrophone class..."]
     
     # Print basic information
-    print(f"Hydrophone: {hydrophone}")
-    print("\nMetadata summary:")
+    lines.append(f"Hydrophone: {hydrophone}")
+    lines.append("\nMetadata summary:")
     metadata = hydrophone.get_metadata_summary()
     for key, value in metadata.items():
-        print(f"  {key}: {value}")
+        lines.append(f"  {key}: {value}")
     
     # Test sensitivity queries
-    print("\nSensitivity tests:")
+    lines.append("\nSensitivity tests:")
     test_frequencies = [150e3, 400e3, 1e6, 5e6, 10e6, 15e6]  # 1, 5, 10, 15 MHz
-    for freq in test_frequencies:
-        sensitivity = hydrophone.get_sensitivity_pa_per_v(freq)
-        print(f"  Sensitivity at {freq/1e6:.1f} MHz: {sensitivity:.2e} Pa/V")
+    sensitivities = hydrophone.get_sensitivity_pa_per_v(np.array(test_frequencies))
+    for freq, sensitivity in zip(test_frequencies, sensitivities):
+        lines.append(f"  Sensitivity at {freq/1e6:.1f} MHz: {sensitivity:.2e} Pa/V")
     
     # Display calibration data info
-    print(f"\nCalibration data shape: {hydrophone.calibration_data.shape}")
-    print("Columns:", list(hydrophone.calibration_data.columns))
-    print("Frequency range: {:.3f} - {:.3f} MHz".format(
+    lines.append(f"\nCalibration data shape: {hydrophone.calibration_data.shape}")
+    lines.append(f"Columns: {list(hydrophone.calibration_data.columns)}")
+    lines.append("Frequency range: {:.3f} - {:.3f} MHz".format(
         hydrophone.calibration_data['FREQ_MHz'].min(),
         hydrophone.calibration_data['FREQ_MHz'].max()
     ))
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def test_deconvolution():
-    """Test the deconvolution functionality."""
-    print("\n" + "="*60)
-    print("Testing deconvolution functionality...")
-    
-    # Path to the calibration file
-    cal_file = Path(__file__).parent.parent / "hydrophone_calibrations" / "HNR0500-2246_xxxxxx-xxxx-xx_xx_20221219 (1).txt"
+@pytest.mark.parametrize("frequencies", [
+    np.array(400e3),                          # 0-d
+    np.array([150e3, 400e3, 1e6, 5e6]),       # 1-d
+    np.array([[150e3, 400e3], [1e6, 25e6]]),  # 2-d
+])
+def test_sensitivity_array_input(hydrophone, frequencies):
+    """Array queries keep the input shape and agree with per-frequency scalar queries."""
+    sensitivities = hydrophone.get_sensitivity_pa_per_v(frequencies)
+    assert np.shape(sensitivities) == frequencies.shape
+    expected = [hydrophone.get_sensitivity_pa_per_v(float(freq)) for freq in frequencies.flat]
+    np.testing.assert_allclose(np.ravel(sensitivities), expected, rtol=1e-12)
+
+
+def test_scalar_sensitivity_matches_vectorized(hydrophone):
+    """Scalar lookups agree with the np.interp path, including both extrapolation branches and NaN."""
+    freq_min, freq_max = hydrophone._freq_hz_min, hydrophone._freq_hz_max
+    test_frequencies = [0.0, freq_min / 2, freq_min, 400e3, 1e6, 5e6, freq_max, 25e6, 60e6, np.nan]
+    expected = hydrophone.get_frequency_response(np.array(test_frequencies))
+    actual = [hydrophone.get_sensitivity_pa_per_v(freq) for freq in test_frequencies]
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("rows", [
+    "0.1\t1e-7\t5\n0.2\t2e-7\t6\n",  # every row too wide
+    "0.1\t1e-7\n0.2\t2e-7\t6\n",      # a later row too wide
+])
+def test_calibration_rows_wider_than_fields(tmp_path, rows):
+    """Data rows with more columns than DATA_FIELD entries are rejected, not shifted into the index."""
+    cal_file = tmp_path / "malformed.txt"
+    cal_file.write_text("DATA_FIELD\tFREQ_MHz\nDATA_FIELD\tSENS_VPERPA\nHEADER_END\t0\n" + rows)
+    with pytest.raises(ValueError):
+        Hydrophone(cal_file)
+
+
+def _reference_deconvolution(hydrophone, voltage_signal, sampling_interval,
+                             center_frequency=None, bandwidth=1.0):
+    """
+    Deconvolution with a full complex FFT, as the Hydrophone class originally did it.
     
-    # Create hydrophone object
-    hydrophone = Hydrophone(cal_file)
+    The bandpass magnitude is evaluated at |f| for both spectrum halves, so the
+    filter keeps the signal amplitude instead of halving it.
+    """
+    fs = 1.0 / sampling_interval
+    frequencies = np.fft.fftfreq(len(voltage_signal), sampling_interval)
+    freq_response = hydrophone.get_frequency_response(np.abs(frequencies))
+    freq_response[0] = hydrophone.get_sensitivity_pa_per_v(hydrophone.calibration_data['FREQ_MHz'].min() * 1e6)
+    if center_frequency is not None:
+        nyquist = fs / 2.0
+        low_cut = max(center_frequency * (1 - bandwidth / 2), 0) / nyquist
+        high_cut = min(center_frequency * (1 + bandwidth / 2), nyquist) / nyquist
+        sos = signal.butter(4, [low_cut, high_cut], btype='band', output='sos')
+        _, h = signal.sosfreqz(sos, worN=np.abs(frequencies), fs=fs)
+        freq_response = freq_response * np.abs(h)
+    return np.fft.ifft(np.fft.fft(voltage_signal) * freq_response).real
+
+
+@pytest.mark.parametrize("center_frequency, bandwidth", [
+    (None, 1.0),
+    (400e3, 1.0),
+    (1e6, 0.5),
+])
+def test_deconvolution_matches_reference(hydrophone, center_frequency, bandwidth):
+    """The rfft path reproduces the complex-FFT deconvolution, bandpass amplitude included."""
+    fs = 100e6
+    t = np.arange(2000) / fs
+    voltage_signal = 1e-3 * np.sin(2 * np.pi * 400e3 * t) + 1e-5 * np.random.default_rng(1).standard_normal(t.size)
+    expected = _reference_deconvolution(hydrophone, voltage_signal, 1 / fs, center_frequency, bandwidth)
+    actual = hydrophone.deconvolve_voltage_signal(voltage_signal, 1 / fs, center_frequency, bandwidth)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9 * np.max(np.abs(expected)))
+
+
+@pytest.mark.parametrize("n_samples", [1601, 12499])  # neither is a next_fast_len length
+def test_deconvolution_edges_match_reference(hydrophone, n_samples):
+    """Lengths without fast FFT kernels are not zero-padded, so the circular edge samples are kept."""
+    fs = 100e6
+    t = np.arange(n_samples) / fs
+    voltage_signal = 1e-3 * np.sin(2 * np.pi * 400e3 * t) + 1e-5 * np.random.default_rng(2).standard_normal(n_samples)
+    expected = _reference_deconvolution(hydrophone, voltage_signal, 1 / fs)
+    actual = hydrophone.deconvolve_voltage_signal(voltage_signal, 1 / fs)
+    atol = 1e-9 * np.max(np.abs(expected))
+    np.testing.assert_allclose(actual[:16], expected[:16], rtol=0, atol=atol)
+    np.testing.assert_allclose(actual[-16:], expected[-16:], rtol=0, atol=atol)
+
+
+def test_float32_response_cached_per_dtype(hydrophone):
+    """float32 captures reuse one float32 response instead of casting the float64 spectrum per call."""
+    voltage_signal = np.zeros(1000, dtype=np.float32)
+    hydrophone.deconvolve_voltage_signal(voltage_signal, 1e-8, center_frequency=400e3)
+    response = hydrophone._deconvolution_response(1000, 1e-8, 400e3, 1.0, np.dtype(np.float32))
+    assert response.dtype == np.float32
+    assert hydrophone._deconvolution_response(1000, 1e-8, 400e3, 1.0, np.dtype(np.float32)) is response
+    assert hydrophone._deconvolution_response(1000, 1e-8, 400e3, 1.0, np.dtype(np.float64)).dtype == np.float64
+
+
+def _run_deconvolution(hydrophone):
+    """Deconvolve the 400 kHz test signal and report the recovery error."""
+    lines = ["\n" + "="*60, "Testing deconvolution functionality..."]
     
-    # Create a test signal (5 MHz sine wave with some noise)
-    fs = 100e6  # 100 MHz sampling rate
+    # Create a test signal (400 kHz sine wave with some noise)
+    fs = DECONV_FS
     duration = 1e-6  # 1 microsecond
-    t = np.linspace(0, duration, int(fs * duration), endpoint=False)
-    
-    # Create test pressure signal (Pa)
     freq_test = 400e3  # 400 kHz
-    pressure_true = 1000 * np.sin(2 * np.pi * freq_test * t)  # 1000 Pa amplitude
-    
-    # Add some noise
-    pressure_true += 10 * np.random.randn(len(t))  # 10 Pa RMS noise
+    t, pressure_true = _make_test_signal(fs, duration, freq_test)
     
     # Convert to voltage using the hydrophone sensitivity
     sensitivity_at_test_freq = hydrophone.get_sensitivity_pa_per_v(freq_test)
@@ -87,81 +199,105 @@ def test_deconvolution():
     rms_signal = np.sqrt(np.mean(pressure_true**2))
     relative_error = rms_error / rms_signal * 100
     
-    print(f"Test signal frequency: {freq_test/1e6:.1f} MHz")
-    print(f"True pressure amplitude: {np.max(np.abs(pressure_true)):.1f} Pa")
-    print(f"Sensitivity at test frequency: {sensitivity_at_test_freq:.2e} Pa/V")
-    print(f"Voltage signal amplitude: {np.max(np.abs(voltage_signal)):.2e} V")
-    print(f"Recovered pressure amplitude: {np.max(np.abs(pressure_recovered)):.1f} Pa")
-    print(f"RMS error: {rms_error:.1f} Pa ({relative_error:.2f}%)")
+    lines.append(f"Test signal frequency: {freq_test/1e6:.1f} MHz")
+    lines.append(f"True pressure amplitude: {np.max(np.abs(pressure_true)):.1f} Pa")
+    lines.append(f"Sensitivity at test frequency: {sensitivity_at_test_freq:.2e} Pa/V")
+    lines.append(f"Voltage signal amplitude: {np.max(np.abs(voltage_signal)):.2e} V")
+    lines.append(f"Recovered pressure amplitude: {np.max(np.abs(pressure_recovered)):.1f} Pa")
+    lines.append(f"RMS error: {rms_error:.1f} Pa ({relative_error:.2f}%)")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return t, pressure_true, pressure_recovered, voltage_signal
 
 
-def plot_results():
-    """Create plots showing the hydrophone calibration and deconvolution test."""
+def test_deconvolution(hydrophone):
+    """Test the deconvolution functionality."""
+    t, pressure_true, pressure_recovered, voltage_signal = _run_deconvolution(hydrophone)
+    
+    # float32 input stays single precision
+    assert pressure_recovered.dtype == np.float32
+    assert pressure_recovered.shape == pressure_true.shape
+    assert np.all(np.isfinite(pressure_recovered))
+    expected = _reference_deconvolution(hydrophone, voltage_signal.astype(np.float64), 1.0 / DECONV_FS)
+    np.testing.assert_allclose(pressure_recovered, expected, rtol=0, atol=1e-5 * np.max(np.abs(expected)))
+
+
+def plot_results(hydrophone, out_dir):
+    """Save plots of the hydrophone calibration and deconvolution test to out_dir."""
     print("\n" + "="*60)
     print("Creating plots...")
     
-    # Path to the calibration file
-    cal_file = Path(__file__).parent.parent / "hydrophone_calibrations" / "HNR0500-2246_xxxxxx-xxxx-xx_xx_20221219 (1).txt"
-    
-    # Create hydrophone object
-    hydrophone = Hydrophone(cal_file)
-    
     # Plot calibration data
     fig1 = hydrophone.plot_calibration_data()
     
     # Test deconvolution and plot results
-    t, pressure_true, pressure_recovered, voltage_signal = test_deconvolution()
+    t, pressure_true, pressure_recovered, voltage_signal = _run_deconvolution(hydrophone)
     
-    # Create deconvolution comparison plot
-    fig2, axes = plt.subplots(3, 1, figsize=(12, 10))
-    
-    # Plot time signals
-    t_us = t * 1e6  # Convert to microseconds
-    
-    axes[0].plot(t_us, pressure_true, 'b-', label='True pressure', alpha=0.7)
-    axes[0].plot(t_us, pressure_recovered, 'r--', label='Recovered pressure', alpha=0.7)
-    axes[0].set_xlabel('Time (µs)')
-    axes[0].set_ylabel('Pressure (Pa)')
-    axes[0].set_title('Deconvolution Test: Pressure Signals')
-    axes[0].legend()
-    axes[0].grid(True)
-    
-    axes[1].plot(t_us, voltage_signal, 'g-', alpha=0.7)
-    axes[1].set_xlabel('Time (µs)')
-    axes[1].set_ylabel('Voltage (V)')
-    axes[1].set_title('Measured Voltage Signal')
-    axes[1].grid(True)
-    
-    # Plot error
-    error = pressure_true - pressure_recovered
-    axes[2].plot(t_us, error, 'k-', alpha=0.7)
-    axes[2].set_xlabel('Time (µs)')
-    axes[2].set_ylabel('Error (Pa)')
-    axes[2].set_title('Deconvolution Error')
-    axes[2].grid(True)
-    
-    plt.tight_layout()
+    # Create deconvolution comparison plot; the 'fast' style simplifies paths and
+    # chunks long lines, and constrained layout replaces a separate tight_layout pass
+    with plt.style.context('fast'):
+        fig2, axes = plt.subplots(3, 1, figsize=(12, 10), layout='constrained')
+        
+        # Plot time signals
+        t_us = t * 1e6  # Convert to microseconds
+        
+        axes[0].plot(t_us, pressure_true, 'b-', label='True pressure', alpha=0.7)
+        axes[0].plot(t_us, pressure_recovered, 'r--', label='Recovered pressure', alpha=0.7)
+        axes[0].set_ylabel('Pressure (Pa)')
+        axes[0].set_title('Deconvolution Test: Pressure Signals')
+        axes[0].legend()
+        
+        axes[1].plot(t_us, voltage_signal, 'g-', alpha=0.7)
+        axes[1].set_ylabel('Voltage (V)')
+        axes[1].set_title('Measured Voltage Signal')
+        
+        # Plot error
+        error = pressure_true - pressure_recovered
+        axes[2].plot(t_us, error, 'k-', alpha=0.7)
+        axes[2].set_ylabel('Error (Pa)')
+        axes[2].set_title('Deconvolution Error')
+        
+        for ax in axes:
+            ax.set_xlabel('Time (µs)')
+            ax.grid(True)
     
-    plt.show()
+    out_dir = Path(out_dir)
+    fig1.savefig(out_dir / "cal.png", dpi=90)
+    fig2.savefig(out_dir / "deconv.png", dpi=90)
+    plt.close('all')
+    print(f"Saved cal.png and deconv.png to {out_dir}")
+
+
+def test_plot_results(hydrophone, tmp_path):
+    """Plots are written to the given directory."""
+    plot_results(hydrophone, tmp_path)
+    assert (tmp_path / "cal.png").is_file()
+    assert (tmp_path / "deconv.png").is_file()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hydrophone class test script")
+    parser.add_argument("--plot", metavar="DIR", type=Path,
+                        help="Save calibration and deconvolution plots to DIR")
+    args = parser.parse_args()
+    
     try:
         # Run basic tests
-        test_hydrophone_basic_functionality()
+        # Outside pytest there is no fixture; build the Hydrophone it would provide
+        from conftest import CAL_FILE
+        hydrophone = Hydrophone(CAL_FILE)
+        test_hydrophone_basic_functionality(hydrophone)
         
         # Run deconvolution test
-        test_deconvolution()
+        test_deconvolution(hydrophone)
         
-        # Create plots (optional - requires matplotlib)
-        try:
-            plot_results()
-        except ImportError:
-            print("\nMatplotlib not available - skipping plots")
-        except Exception as e:
-            print(f"\nError creating plots: {e}")
+        # Create plots (optional, with --plot DIR)
+        if args.plot is not None:
+            try:
+                plot_results(hydrophone, args.plot)
+            except Exception as e:
+                print(f"\nError creating plots: {e}")
         
         print("\n" + "="*60)
         print("All tests completed successfully!")
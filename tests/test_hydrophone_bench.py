@@ -0,0 +1,33 @@
+"""
+Benchmarks for the Hydrophone deconvolution path.
+
+Run with:
+    pytest tests/test_hydrophone_bench.py --benchmark-only --benchmark-min-rounds=5
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# 1 M samples at 100 MHz, float32 like the scope data
+N_SAMPLES = 1_000_000
+SAMPLING_INTERVAL = 1 / 100e6
+
+
+@pytest.fixture(scope="module")
+def voltage_signal():
+    return np.random.default_rng(0).standard_normal(N_SAMPLES).astype(np.float32)
+
+
+def test_deconvolve_bench(benchmark, hydrophone, voltage_signal):
+    """Single long capture, without bandpass filtering."""
+    pressure = benchmark(hydrophone.deconvolve_voltage_signal, voltage_signal, SAMPLING_INTERVAL)
+    assert pressure.shape == voltage_signal.shape
+
+
+def test_deconvolve_bandpass_bench(benchmark, hydrophone, voltage_signal):
+    """Single long capture with the 400 kHz Butterworth bandpass."""
+    pressure = benchmark(hydrophone.deconvolve_voltage_signal, voltage_signal, SAMPLING_INTERVAL,
+                         center_frequency=400e3, bandwidth=1.0)
+    assert pressure.shape == voltage_signal.shape